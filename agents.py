@@ -1,25 +1,33 @@
 from crewai import Agent
-from langchain_openai import ChatOpenAI
 
+from llm import ReviewLLM
+from llm_cache import cache_creative, get_llm_cache
+from tools.knowledge import KnowledgeSearchTool
 from tools.search import DuckDuckGoSearchTool
 from tools.web_scraper import ScrapeWebsiteTool
 
 
 class SEOCrewAgents:
-    def __init__(self):
+    def __init__(self, llm_precise=None, llm_creative=None):
         # Tools (CrewAI-native)
         self.search_tool = DuckDuckGoSearchTool()
         self.scrape_tool = ScrapeWebsiteTool()
+        self.knowledge_tool = KnowledgeSearchTool()
+
+        # Completion cache; creative stages opt out under LLM_CACHE=precise-only
+        llm_cache = get_llm_cache()
 
         # LLM – consider using your newest model here if available
-        self.llm_precise = ChatOpenAI(
+        self.llm_precise = llm_precise or ReviewLLM(
             model="gpt-4.1",      # or latest 4.x flagship in the docs
-            temperature=0.3
+            temperature=0.3,
+            cache=llm_cache
         )
 
-        self.llm_creative = ChatOpenAI(
+        self.llm_creative = llm_creative or ReviewLLM(
             model="gpt-4.1",      # same model
-            temperature=0.7
+            temperature=0.7,
+            cache=llm_cache if cache_creative() else None
         )
 
 
@@ -45,7 +53,7 @@ class SEOCrewAgents:
                 "and regulatory structures. You care more about accuracy and caveats than about making the "
                 "room look good."
             ),
-            tools=[self.search_tool, self.scrape_tool],
+            tools=[self.knowledge_tool, self.search_tool, self.scrape_tool],
             verbose=True,
             llm=self.llm_precise
         )
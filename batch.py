@@ -0,0 +1,191 @@
+"""
+Headless batch runner: review many operators across a pool of processes.
+
+    python batch.py operators.txt --out reviews/ --workers 4
+
+The input file holds one operator name or URL per line (blank lines and
+lines starting with '#' are ignored). Each review writes `<slug>.md` and
+`<slug>.log` (plus span traces) into the output directory, and a `summary.json` with
+throughput stats is written at the end. With --jurisdictions uk,us each market's
+edition is also written to `<slug>.<market>.md`. --refresh updates the last
+publication of each operator, rewriting only the sections whose facts changed.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+import limits
+
+
+def read_operators(path):
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def slugify(operator_input):
+    slug = re.sub(r"^https?://", "", operator_input.lower())
+    return re.sub(r"[^a-z0-9]+", "-", slug).strip("-") or "operator"
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # Nearest-rank percentile
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def _init_worker(llm_semaphore, scrape_semaphore):
+    load_dotenv()
+    limits.configure(llm_semaphore, scrape_semaphore)
+
+
+def review_operator(operator_input, out_dir, crew_workers, jurisdictions=None, incremental=False):
+    from main import PokerReviewCrew
+
+    slug = slugify(operator_input)
+    started = time.perf_counter()
+
+    with open(os.path.join(out_dir, f"{slug}.log"), "w", encoding="utf-8") as log_file:
+        def write_log(line):
+            log_file.write(line + "\n")
+            log_file.flush()
+
+        try:
+            crew = PokerReviewCrew(
+                operator_input,
+                log_callback=write_log,
+                workers=crew_workers,
+                trace_dir=out_dir,
+                jurisdictions=jurisdictions,
+                incremental=incremental
+            )
+            result = crew.run()
+        except Exception as e:
+            write_log(f"❌ Review failed: {e}")
+            return {
+                "operator": operator_input,
+                "ok": False,
+                "seconds": time.perf_counter() - started,
+                "error": str(e),
+            }
+
+    with open(os.path.join(out_dir, f"{slug}.md"), "w", encoding="utf-8") as f:
+        f.write(result["final_review"])
+    for market, edition in result.get("markets", {}).items():
+        with open(os.path.join(out_dir, f"{slug}.{market}.md"), "w", encoding="utf-8") as f:
+            f.write(edition["final_review"])
+
+    return {
+        "operator": operator_input,
+        "ok": True,
+        "seconds": time.perf_counter() - started,
+        "error": None,
+    }
+
+
+def summarize(results, wall_seconds):
+    latencies = [r["seconds"] for r in results if r["ok"]]
+    failures = [r for r in results if not r["ok"]]
+    return {
+        "reviews": len(results),
+        "succeeded": len(latencies),
+        "failed": len(failures),
+        "wall_seconds": wall_seconds,
+        "reviews_per_hour": len(latencies) / wall_seconds * 3600 if wall_seconds else 0.0,
+        "p50_seconds": percentile(latencies, 50),
+        "p95_seconds": percentile(latencies, 95),
+        "failures": [{"operator": r["operator"], "error": r["error"]} for r in failures],
+    }
+
+
+def run_batch(operators, out_dir, workers=2, max_llm_calls=8, max_scrapes=16, crew_workers=None,
+              jurisdictions=None, incremental=False):
+    os.makedirs(out_dir, exist_ok=True)
+
+    with multiprocessing.Manager() as manager:
+        # Shared by every worker so the limits hold across the whole batch
+        llm_semaphore = manager.BoundedSemaphore(max_llm_calls)
+        scrape_semaphore = manager.BoundedSemaphore(max_scrapes)
+
+        started = time.perf_counter()
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(llm_semaphore, scrape_semaphore)
+        ) as pool:
+            futures = {
+                pool.submit(review_operator, operator, out_dir, crew_workers, jurisdictions, incremental): operator
+                for operator in operators
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"operator": futures[future], "ok": False, "seconds": 0.0, "error": str(e)}
+                results.append(result)
+                status = "✅" if result["ok"] else "❌"
+                print(f"{status} {result['operator']} ({result['seconds']:.0f}s) "
+                      f"[{len(results)}/{len(operators)}]")
+
+        summary = summarize(results, time.perf_counter() - started)
+
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate poker operator reviews in bulk.")
+    parser.add_argument("operators", help="File with one operator name or URL per line")
+    parser.add_argument("--out", default="reviews", help="Output directory")
+    parser.add_argument("--workers", type=int, default=2, help="Reviews running in parallel")
+    parser.add_argument("--max-llm-calls", type=int, default=8, help="Concurrent LLM calls across all workers")
+    parser.add_argument("--max-scrapes", type=int, default=16, help="Concurrent scrapes across all workers")
+    parser.add_argument("--crew-workers", type=int, default=None, help="Stages running in parallel per review")
+    parser.add_argument(
+        "--jurisdictions",
+        default=None,
+        help="Comma-separated markets, e.g. uk,us,ontario; each gets its own <slug>.<market>.md"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Update each operator's last publication, rewriting only sections whose facts changed"
+    )
+    args = parser.parse_args(argv)
+
+    operators = read_operators(args.operators)
+    summary = run_batch(
+        operators,
+        args.out,
+        workers=args.workers,
+        max_llm_calls=args.max_llm_calls,
+        max_scrapes=args.max_scrapes,
+        crew_workers=args.crew_workers,
+        jurisdictions=args.jurisdictions.split(",") if args.jurisdictions else None,
+        incremental=args.refresh
+    )
+
+    print(
+        f"\n📊 {summary['succeeded']}/{summary['reviews']} reviews in {summary['wall_seconds']:.0f}s — "
+        f"{summary['reviews_per_hour']:.1f} reviews/hour, "
+        f"p50 {summary['p50_seconds']:.0f}s, p95 {summary['p95_seconds']:.0f}s, "
+        f"{summary['failed']} failed"
+    )
+    for failure in summary["failures"]:
+        print(f"   ❌ {failure['operator']}: {failure['error']}")
+
+
+if __name__ == "__main__":
+    main()
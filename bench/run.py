@@ -0,0 +1,222 @@
+"""
+Offline benchmark: runs the full PokerReviewCrew pipeline against a stub chat
+model, a stub search backend and a local server hosting saved operator pages,
+so no OpenAI or DuckDuckGo access is needed.
+
+    python -m bench.run                      # compare against bench/baseline.json
+    python -m bench.run --update-baseline    # record a new baseline
+
+Exits non-zero when any metric regresses by more than --tolerance.
+"""
+import argparse
+import atexit
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Caches and checkpoints would turn repeat runs into lookups; measure the real work
+os.environ.setdefault("OPENAI_API_KEY", "bench-offline")
+os.environ["SCRAPE_CACHE"] = "0"
+os.environ["SEARCH_CACHE_PERSIST"] = "0"
+os.environ["LLM_CACHE"] = "off"
+os.environ["CREW_CHECKPOINTS"] = "0"
+# The knowledge index and revision store still run; give them a throwaway directory, not the real .cache
+os.environ["SCRAPE_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench-cache-")
+atexit.register(shutil.rmtree, os.environ["SCRAPE_CACHE_DIR"], ignore_errors=True)
+# Every fixture page comes from one local host; politeness limits would only measure themselves
+os.environ.setdefault("SCRAPE_HOST_RATE", "1000")
+os.environ.setdefault("SCRAPE_HOST_BURST", "1000")
+os.environ.setdefault("SEARCH_RATE", "1000")
+os.environ.setdefault("SEARCH_BURST", "1000")
+
+from bench.fixture_server import FIXTURES_DIR, serve
+from bench.stub_llm import StubLLM
+from bench.stub_search import StubSearchClient
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+# Timings below this much slower are scheduler noise however large the fraction
+SLACK_SECONDS = 0.1
+
+
+def prepare_fixtures(directory, heavy_bytes):
+    """Copy the saved pages and add a multi-MB landing page built from them."""
+    for name in os.listdir(FIXTURES_DIR):
+        shutil.copy(os.path.join(FIXTURES_DIR, name), directory)
+
+    with open(os.path.join(FIXTURES_DIR, "home.html"), encoding="utf-8") as f:
+        home = f.read()
+    body = home.split("<main>", 1)[1].split("</main>", 1)[0]
+    repeats = max(1, heavy_bytes // len(body))
+    heavy = home.replace(body, body * repeats)
+    with open(os.path.join(directory, "heavy.html"), "w", encoding="utf-8") as f:
+        f.write(heavy)
+
+    return sorted(name for name in os.listdir(directory) if name.endswith(".html"))
+
+
+def bench_pipeline(base_url, latency, completion_tokens, workers, cassette=None, cassette_mode=None):
+    from agents import SEOCrewAgents
+    from main import PokerReviewCrew
+    from tools.search import search_cache
+
+    search_cache.clear()
+    llm = StubLLM(base_url, latency=latency, completion_tokens=completion_tokens)
+    first_output = []
+
+    def on_stream(stage, text):
+        if not first_output:
+            first_output.append(time.perf_counter() - started)
+
+    crew = PokerReviewCrew(
+        "Fixture Poker",
+        agents=SEOCrewAgents(llm_precise=llm, llm_creative=llm),
+        workers=workers,
+        checkpoints=False,
+        stream_callback=on_stream,
+        cassette=cassette,
+        cassette_mode=cassette_mode
+    )
+
+    started = time.perf_counter()
+    crew.run()
+    total = time.perf_counter() - started
+    if crew.cassette is not None and crew.cassette.misses:
+        raise RuntimeError(f"Replay missed {crew.cassette.misses} recorded exchanges")
+    return total, crew.tracer.summary(), first_output[0] if first_output else total
+
+
+def bench_scraper(base_url, directory, pages, rounds):
+    from tools.chunks import select_chunks
+    from tools.web_scraper import ScrapeWebsiteTool, extract_text
+
+    urls = [f"{base_url}/{pages[i % len(pages)]}" for i in range(rounds)]
+    total_bytes = sum(os.path.getsize(os.path.join(directory, url.rsplit("/", 1)[1])) for url in urls)
+
+    tool = ScrapeWebsiteTool()
+    started = time.perf_counter()
+    results = tool.scrape_many(urls)
+    scrape_seconds = time.perf_counter() - started
+    errors = [r for r in results if r.startswith("Error scraping website")]
+    if errors:
+        raise RuntimeError(f"Fixture scrape failed: {errors[0]}")
+
+    with open(os.path.join(directory, "heavy.html"), "rb") as f:
+        heavy = f.read()
+    started = time.perf_counter()
+    for _ in range(3):
+        text = extract_text(heavy)
+    parse_seconds = (time.perf_counter() - started) / 3
+
+    started = time.perf_counter()
+    for _ in range(3):
+        select_chunks(text, fields=["rakeback", "withdrawals"])
+    select_seconds = (time.perf_counter() - started) / 3
+
+    return {
+        "scrape_pages_per_second": len(urls) / scrape_seconds,
+        "scrape_mb_per_second": total_bytes / 1e6 / scrape_seconds,
+        "parse_mb_per_second": len(heavy) / 1e6 / parse_seconds,
+        "select_mb_per_second": len(text) / 1e6 / select_seconds,
+    }
+
+
+def collect(args):
+    from tools.search import set_search_client
+
+    metrics = {}
+    with tempfile.TemporaryDirectory() as directory:
+        pages = prepare_fixtures(directory, args.heavy_mb * 1_000_000)
+        with serve(directory) as base_url:
+            set_search_client(StubSearchClient(base_url))
+
+            overhead, _, _ = bench_pipeline(base_url, 0.0, args.tokens, args.workers)
+            metrics["pipeline_overhead_seconds"] = overhead
+
+            recording = os.path.join(directory, "pipeline.jsonl.gz")
+            total, stages, first_output = bench_pipeline(
+                base_url, args.latency, args.tokens, args.workers, cassette=recording, cassette_mode="record"
+            )
+            metrics["pipeline_seconds"] = total
+            metrics["first_output_seconds"] = first_output
+            for stage in stages:
+                if ":" in stage["stage"]:
+                    # Per-section spans depend on which sections share a worker; the stage total covers them
+                    continue
+                metrics[f"stage_{stage['stage']}_seconds"] = stage["seconds"]
+
+            # The same run from its recording: orchestration cost with no model or network time
+            replay, _, _ = bench_pipeline(
+                base_url, args.latency, args.tokens, args.workers, cassette=recording, cassette_mode="replay"
+            )
+            metrics["replay_seconds"] = replay
+
+            metrics.update(bench_scraper(base_url, directory, pages, args.pages))
+    return metrics
+
+
+def compare(metrics, baseline, tolerance):
+    """Metrics worse than baseline by more than `tolerance` (a fraction)."""
+    regressions = []
+    for name, base in baseline.items():
+        value = metrics.get(name)
+        if value is None or not base:
+            continue
+        if name.endswith("_per_second"):
+            change = (base - value) / base
+        else:
+            change = (value - base) / base
+            if value - base <= SLACK_SECONDS:
+                continue
+        if change > tolerance:
+            regressions.append((name, base, value, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline performance benchmark.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub LLM seconds per call")
+    parser.add_argument("--tokens", type=int, default=400, help="Stub completion tokens per answer")
+    parser.add_argument("--workers", type=int, default=2, help="Pipeline stages running at once")
+    parser.add_argument("--pages", type=int, default=40, help="Pages fetched in the scraper benchmark")
+    parser.add_argument("--heavy-mb", type=int, default=3, help="Size of the heavy landing page")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression fraction")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    metrics = collect(args)
+
+    print("\n📊 Benchmark results")
+    for name, value in metrics.items():
+        print(f"   {name:<45} {value:10.3f}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nℹ️ No baseline at {args.baseline}; run with --update-baseline to record one.")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare(metrics, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}:")
+        for name, base, value, change in regressions:
+            print(f"   {name}: {base:.3f} -> {value:.3f} ({change:+.0%})")
+        return 1
+
+    print(f"\n✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
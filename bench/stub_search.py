@@ -0,0 +1,15 @@
+class StubSearchClient:
+    """Search backend returning canned results that point at the fixture server."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.queries = []
+
+    def run(self, query):
+        self.queries.append(query)
+        return (
+            f"Fixture Poker review - {self.base_url}/home.html - Cash games NL2-NL1000, MGA licence. "
+            f"Fixture Poker bonus - {self.base_url}/bonus.html - 100% up to $600. "
+            f"Fixture Poker rakeback - {self.base_url}/rakeback.html - up to 45% cashback. "
+            f"Fixture Poker banking - {self.base_url}/banking.html - withdrawals within 24h."
+        )
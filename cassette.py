@@ -0,0 +1,161 @@
+import contextvars
+import gzip
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import tracing
+
+
+_active = contextvars.ContextVar("cassette", default=None)
+
+
+class CassetteMiss(Exception):
+    pass
+
+
+class Cassette:
+    """
+    Record or replay every network exchange of a run: chat completions,
+    search results, fetched pages and knowledge lookups.
+
+    A cassette is a gzipped JSON-lines file with one entry per exchange:
+    kind, key, stage, response and how long it took. In replay nothing
+    touches the network: each request is answered from the entry with the
+    same kind and key, or, for a completion whose prompt has drifted, the
+    next unused completion recorded for the same stage. A request with no
+    recording raises CassetteMiss.
+
+    latency: in replay, the fraction of each recorded duration to sleep
+        (0 replays at full speed, 1 reproduces the recorded timings)
+    """
+
+    def __init__(self, path, mode="replay", latency=0.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode '{mode}' (use 'record' or 'replay')")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.started = time.time()
+        self.entries = []
+        self.replayed = 0
+        self.drifted = 0
+        self.misses = 0
+        self._by_key = defaultdict(deque)
+        self._by_stage = defaultdict(deque)
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self._load()
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry.get("kind") == "header":
+                    continue
+                self._by_key[(entry["kind"], entry["key"])].append(entry)
+                if entry["kind"] == "llm":
+                    self._by_stage[entry.get("stage")].append(entry)
+
+    def save(self):
+        if self.mode != "record":
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            entries = sorted(self.entries, key=lambda entry: entry["offset"])
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"kind": "header", "version": 1, "created_at": self.started}) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str) + "\n")
+
+    def _record(self, kind, key, value, seconds, started):
+        with self._lock:
+            self.entries.append({
+                "kind": kind,
+                "key": key,
+                "stage": tracing.current_stage(),
+                "offset": round(started - self.started, 3),
+                "seconds": round(seconds, 3),
+                "value": value,
+            })
+
+    def _take(self, kind, key):
+        with self._lock:
+            recorded = self._by_key.get((kind, key))
+            if recorded:
+                entry = recorded.popleft() if len(recorded) > 1 else recorded[0]
+                if kind == "llm" and entry in self._by_stage[entry.get("stage")]:
+                    self._by_stage[entry.get("stage")].remove(entry)
+                self.replayed += 1
+                return entry
+            if kind == "llm":
+                # The prompt changed (e.g. a different context slice); fall back to the stage's next answer
+                pending = self._by_stage.get(tracing.current_stage())
+                if pending:
+                    self.drifted += 1
+                    return pending.popleft()
+            self.misses += 1
+        raise CassetteMiss(f"No recorded {kind} response for {key!r} in {self.path}")
+
+    def through(self, kind, key, fetch):
+        if self.mode == "replay":
+            entry = self._take(kind, key)
+            if self.latency and entry["seconds"]:
+                time.sleep(entry["seconds"] * self.latency)
+            return entry["value"]
+
+        started = time.time()
+        value = fetch()
+        self._record(kind, key, value, time.time() - started, started)
+        return value
+
+    def seen(self, kind, key, value):
+        """Record a response served from a local cache, so a replay with cold caches still finds it."""
+        if self.mode == "record":
+            self._record(kind, key, value, 0.0, time.time())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "recorded": len(self.entries),
+                "replayed": self.replayed,
+                "drifted": self.drifted,
+                "misses": self.misses,
+            }
+
+
+@contextmanager
+def use(cassette):
+    token = _active.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _active.reset(token)
+
+
+def active():
+    return _active.get()
+
+
+def through(kind, key, fetch):
+    """fetch() when no cassette is active; otherwise record it, or answer from the recording."""
+    cassette = _active.get()
+    if cassette is None:
+        return fetch()
+    return cassette.through(kind, key, fetch)
+
+
+def replaying():
+    cassette = _active.get()
+    return cassette is not None and cassette.mode == "replay"
+
+
+def seen(kind, key, value):
+    """Note a cache hit while recording. `value` may be a callable, evaluated only then."""
+    cassette = _active.get()
+    if cassette is not None and cassette.mode == "record":
+        cassette.seen(kind, key, value() if callable(value) else value)
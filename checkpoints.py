@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import storage
+
+
+DEFAULT_PATH = storage.data_path("checkpoints.sqlite3")
+# Older outputs are rerun: research reused from last week would republish last week's bonuses (0 = no limit)
+MAX_AGE = int(os.environ.get("CHECKPOINT_MAX_AGE", 24 * 60 * 60))
+
+
+def fingerprint(*parts):
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def task_config_hash(task, route=None):
+    """
+    Hash of everything that shapes a stage's prompt: task text, agent persona,
+    model (or the routed model chain) and tools.
+    """
+    agent = task.agent
+    llm = getattr(agent, "llm", None)
+    return fingerprint(
+        task.description,
+        task.expected_output,
+        agent.role,
+        agent.goal,
+        agent.backstory,
+        getattr(llm, "model", None),
+        getattr(llm, "temperature", None),
+        sorted(tool.name for tool in (task.tools or agent.tools or [])),
+        route.models() if route else None
+    )
+
+
+class CheckpointStore:
+    """
+    Durable store of stage outputs keyed by operator, stage name, stage config
+    hash and the hash of the upstream context it was given. A stage whose key
+    is found can be skipped on a rerun; any change upstream changes the key of
+    every stage after it. Checkpoints older than `max_age` seconds are not
+    reused.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_age=MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        with storage.open_db(path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "key TEXT PRIMARY KEY, operator TEXT NOT NULL, task TEXT NOT NULL, "
+                "raw TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return storage.connect(self.path)
+
+    @staticmethod
+    def key(operator_input, name, config_hash, inputs):
+        return fingerprint(
+            operator_input.strip().lower(),
+            name,
+            config_hash,
+            [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in inputs]
+        )
+
+    def load(self, key):
+        """(raw output, saved at) of a checkpoint young enough to reuse, else None."""
+        oldest = time.time() - self.max_age if self.max_age else 0
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT raw, created_at FROM checkpoints WHERE key = ? AND created_at >= ?", (key, oldest)
+            ).fetchone()
+        return row
+
+    def save(self, key, operator_input, name, raw):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (key, operator, task, raw, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, operator_input.strip().lower(), name, raw, time.time())
+            )
@@ -0,0 +1,194 @@
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import List
+
+import yaml
+
+
+RULES_DIR = os.environ.get(
+    "COMPLIANCE_RULES_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "compliance_rules")
+)
+
+SEVERITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+
+@dataclass
+class Rule:
+    id: str
+    severity: str
+    message: str
+    phrases: List[str] = field(default_factory=list)
+    patterns: List[str] = field(default_factory=list)
+    required: bool = False
+
+    def regex(self):
+        alternatives = [rf"(?<!\w){re.escape(phrase)}(?!\w)" for phrase in self.phrases]
+        return "|".join(alternatives + list(self.patterns))
+
+
+@dataclass
+class Flag:
+    rule: str
+    severity: str
+    message: str
+    match: str = ""
+    paragraph: int = -1
+    snippet: str = ""
+
+    def __str__(self):
+        text = f"{self.severity.upper()} · {self.message}"
+        if self.match:
+            text += f": “{self.match}” — …{self.snippet}…"
+        return text
+
+
+class RulePack:
+    """
+    All flagging rules for one jurisdiction compiled into a single
+    alternation, so an article is scanned in one pass regardless of how many
+    phrases there are. Required rules each get their own search: matches in
+    one alternation can't overlap, so a shared phrase would hide all but one.
+    """
+
+    def __init__(self, name, rules, disclaimers):
+        self.name = name
+        self.rules = {rule.id: rule for rule in rules}
+        self.disclaimers = disclaimers
+        groups = [
+            f"(?P<r{i}>{rule.regex()})"
+            for i, rule in enumerate(rules)
+            if rule.regex() and not rule.required
+        ]
+        self._groups = {f"r{i}": rule for i, rule in enumerate(rules)}
+        self._regex = re.compile("|".join(groups), re.IGNORECASE) if groups else None
+        self._required = [
+            (rule, re.compile(rule.regex(), re.IGNORECASE) if rule.regex() else None)
+            for rule in rules
+            if rule.required
+        ]
+
+    def scan(self, text):
+        paragraphs = split_paragraphs(text)
+        flags = []
+
+        for index, paragraph in enumerate(paragraphs):
+            for match in self._regex.finditer(paragraph) if self._regex else []:
+                rule = self._groups[match.lastgroup]
+                start, end = match.span()
+                flags.append(Flag(
+                    rule=rule.id,
+                    severity=rule.severity,
+                    message=rule.message,
+                    match=match.group(0),
+                    paragraph=index,
+                    snippet=paragraph[max(0, start - 60):end + 60].replace("\n", " ")
+                ))
+
+        for rule, regex in self._required:
+            if regex is None or not any(regex.search(paragraph) for paragraph in paragraphs):
+                flags.append(Flag(rule=rule.id, severity=rule.severity, message=rule.message))
+
+        flags.sort(key=lambda flag: (SEVERITY_ORDER.get(flag.severity, 3), flag.paragraph))
+        return ScanResult(flags, paragraphs, self)
+
+
+@dataclass
+class ScanResult:
+    flags: List[Flag]
+    paragraphs: List[str]
+    pack: RulePack
+
+    @property
+    def clean(self):
+        return not self.flags
+
+    @property
+    def flagged_paragraphs(self):
+        return sorted({flag.paragraph for flag in self.flags if flag.paragraph >= 0})
+
+    @property
+    def missing_disclaimers(self):
+        return [flag for flag in self.flags if flag.paragraph < 0]
+
+    def as_strings(self):
+        return [str(flag) for flag in self.flags]
+
+
+def split_paragraphs(text):
+    return [p for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+
+def _load_file(name):
+    path = os.path.join(RULES_DIR, f"{name}.yaml")
+    if not os.path.exists(path):
+        raise ValueError(f"No compliance rule pack '{name}' in {RULES_DIR}")
+    with open(path, encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    rules = [
+        Rule(
+            id=rule["id"],
+            severity=rule.get("severity", "medium"),
+            message=rule.get("message", rule["id"]),
+            phrases=[str(p) for p in rule.get("phrases", [])],
+            patterns=list(rule.get("patterns", [])),
+            required=bool(rule.get("required", False))
+        )
+        for rule in data.get("rules", [])
+    ]
+    return rules, data.get("disclaimer")
+
+
+_packs = {}
+_packs_lock = threading.Lock()
+
+
+def load_pack(jurisdiction=None):
+    """The base rules plus the pack for `jurisdiction` (e.g. "uk", "us", "ontario")."""
+    key = (jurisdiction or "").lower() or None
+    with _packs_lock:
+        if key not in _packs:
+            rules, disclaimer = _load_file("base")
+            disclaimers = [disclaimer] if disclaimer else []
+            if key:
+                extra_rules, extra_disclaimer = _load_file(key)
+                rules += extra_rules
+                if extra_disclaimer:
+                    # The market's own disclaimer supersedes the generic one
+                    disclaimers = [extra_disclaimer]
+            _packs[key] = RulePack(key or "base", rules, disclaimers)
+        return _packs[key]
+
+
+def available_packs():
+    """Jurisdictions with a rule pack, e.g. ["ontario", "uk", "us"]."""
+    return sorted(
+        name[:-len(".yaml")] for name in os.listdir(RULES_DIR)
+        if name.endswith(".yaml") and name != "base.yaml"
+    )
+
+
+def scan(text, jurisdiction=None):
+    return load_pack(jurisdiction).scan(text)
+
+
+def flagged_block(result):
+    """Flagged paragraphs tagged [[P<n>]] with their flags, for the LLM reviewer."""
+    blocks = []
+    for index in result.flagged_paragraphs:
+        flags = [flag for flag in result.flags if flag.paragraph == index]
+        notes = "\n".join(f"- {flag.message}: \"{flag.match}\"" for flag in flags)
+        blocks.append(f"[[P{index}]]\n{result.paragraphs[index]}\nFlags:\n{notes}")
+    return "\n\n".join(blocks)
+
+
+def parse_rewrites(text):
+    """{paragraph index: corrected text} from a response in the [[P<n>]] format."""
+    rewrites = {}
+    for match in re.finditer(r"\[\[P(\d+)\]\]\s*(.*?)(?=\[\[P\d+\]\]|\Z)", text, re.DOTALL):
+        body = re.split(r"\n\s*Flags:\s*\n", match.group(2))[0].strip()
+        if body:
+            rewrites[int(match.group(1))] = body
+    return rewrites
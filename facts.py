@@ -0,0 +1,175 @@
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+# Topic -> keywords matched against a fact's field path
+TOPICS = {
+    "bonus": ("bonus", "welcome", "promotion", "promo", "freeroll"),
+    "rakeback": ("rakeback", "rake", "loyalty", "cashback", "vip", "reward"),
+    "games": ("game", "traffic", "stakes", "tournament", "mtt", "cash", "liquidity", "player"),
+    "software": ("software", "mobile", "app", "client", "platform", "hud"),
+    "banking": ("banking", "deposit", "withdraw", "payment", "payout", "cashout"),
+    "licensing": ("licen", "regulat", "jurisdiction", "legal", "restricted", "countr"),
+    "reputation": ("reputation", "trust", "security", "complaint", "rating", "network", "owner"),
+}
+
+
+@dataclass
+class Fact:
+    path: str
+    value: object
+    source_url: Optional[str] = None
+    confidence: Optional[str] = None
+    variants: List[object] = field(default_factory=list)
+    topic: str = "other"
+
+    def render(self, detail=True):
+        line = f"- {self.path}: {_compact(self.value)}"
+        notes = []
+        if self.confidence:
+            notes.append(f"confidence: {self.confidence}")
+        if detail and self.source_url:
+            notes.append(f"source: {self.source_url}")
+        if detail and self.variants:
+            notes.append("variants: " + "; ".join(_compact(v) for v in self.variants))
+        return line + (f" ({', '.join(notes)})" if notes else "")
+
+    def fingerprint(self):
+        """Hash of the path and normalized value; a new source or confidence alone is not a change."""
+        value = re.sub(r"\s+", " ", _compact(self.value)).strip().lower()
+        return hashlib.sha256(f"{self.path}\n{value}".encode("utf-8")).hexdigest()
+
+
+def _compact(value):
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _topic(path):
+    # The top-level group decides ("banking.cashout_time" is banking, not games for "cash");
+    # the full path is only searched when the group names no topic
+    lowered = path.lower()
+    for part in (lowered.split(".")[0], lowered):
+        for topic, keywords in TOPICS.items():
+            if any(keyword in part for keyword in keywords):
+                return topic
+    return "other"
+
+
+def _text(value):
+    """A string field as the dataclass expects it: a list gives its first string, anything else None."""
+    if isinstance(value, list):
+        value = next((item for item in value if isinstance(item, str)), None)
+    return value if isinstance(value, str) else None
+
+
+def _load_json(raw):
+    """The first JSON object in `raw`, whether fenced in ``` or embedded in prose."""
+    fenced = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", raw, re.DOTALL)
+    candidates = [fenced.group(1)] if fenced else []
+    start, end = raw.find("{"), raw.rfind("}")
+    if start != -1 and end > start:
+        candidates.append(raw[start:end + 1])
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+class FactStore:
+    """
+    Research output parsed once into typed facts, so later stages can be
+    handed only the topics they need instead of the whole research blob.
+    """
+
+    def __init__(self, facts, raw=""):
+        self.facts = facts
+        self.raw = raw
+
+    @classmethod
+    def from_output(cls, raw):
+        data = _load_json(raw)
+        facts = []
+        if data is not None:
+            cls._collect(data, "", facts)
+        return cls(facts, raw)
+
+    @classmethod
+    def _collect(cls, data, prefix, facts):
+        for key, value in data.items():
+            path = f"{prefix}.{key}" if prefix else str(key)
+            if isinstance(value, dict) and "value" in value:
+                variants = value.get("variants") or []
+                facts.append(Fact(
+                    path=path,
+                    value=value.get("value"),
+                    source_url=_text(value.get("source_url")),
+                    confidence=_text(value.get("confidence")),
+                    variants=variants if isinstance(variants, list) else [variants],
+                    topic=_topic(path)
+                ))
+            elif isinstance(value, dict):
+                cls._collect(value, path, facts)
+            else:
+                facts.append(Fact(path=path, value=value, topic=_topic(path)))
+
+    @property
+    def parsed(self):
+        return bool(self.facts)
+
+    def select(self, topics=None):
+        if not topics:
+            return list(self.facts)
+        return [fact for fact in self.facts if fact.topic in topics]
+
+    def render(self, topics=None, detail=True):
+        """
+        Facts as compact bullet lines. Falls back to the raw research output
+        when it could not be parsed, so nothing is silently lost.
+        """
+        if not self.parsed:
+            return self.raw
+        facts = self.select(topics)
+        if not facts:
+            return "No research facts recorded for: " + ", ".join(topics)
+        return "Verified research facts:\n" + "\n".join(fact.render(detail) for fact in facts)
+
+
+def section_fact_paths(heading, text, facts):
+    """
+    Paths of the facts a written section relies on: every fact on a topic its
+    heading covers, plus any fact whose value (or a figure in it, like "$600"
+    or "27%") appears in the text.
+    """
+    lowered = heading.lower()
+    topics = {topic for topic, keywords in TOPICS.items() if any(keyword in lowered for keyword in keywords)}
+    text = text.lower()
+    paths = []
+    for fact in facts:
+        value = _compact(fact.value).lower().strip()
+        figures = re.findall(r"[$€£]?\d[\d,.]*%?", value)
+        if (
+            fact.topic in topics
+            or (len(value) >= 4 and value in text)
+            or any(len(figure) >= 2 and figure in text for figure in figures)
+        ):
+            paths.append(fact.path)
+    return paths
+
+
+def keyword_section(serp_raw):
+    """
+    The keyword-related blocks of the SERP analysis (primary/secondary
+    keywords and headings), or the whole output when none can be found.
+    """
+    blocks = re.split(r"\n\s*\n|\n(?=#)", serp_raw)
+    keep = [block.strip() for block in blocks if re.search(r"keyword|heading|H1|H2", block, re.IGNORECASE)]
+    return "\n\n".join(keep) if keep else serp_raw
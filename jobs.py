@@ -0,0 +1,403 @@
+"""
+Persistent review queue and the worker pool that drains it.
+
+    python jobs.py --workers 2
+
+The Streamlit app only submits jobs and polls them; reviews run in these
+worker processes, so a reload or a closed tab doesn't lose a run and
+concurrent users don't compete for the server's threads. The app starts a
+pool itself (JOB_WORKERS, default 2) unless one is already running against
+the same queue; set JOB_WORKERS=0 to run the pool separately.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import uuid
+
+from dotenv import load_dotenv
+
+import limits
+import storage
+
+
+DEFAULT_PATH = os.environ.get(
+    "JOB_QUEUE_PATH",
+    storage.data_path("jobs.sqlite3")
+)
+HEARTBEAT_SECONDS = 5
+# A worker silent for this long is presumed dead and its job goes back on the queue
+STALE_SECONDS = 60
+MAX_ATTEMPTS = 2
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue shared by the app and the worker processes.
+
+    Jobs move queued -> running -> done | failed. Log lines are appended as
+    the crew emits them so the UI can stream progress, and the finished
+    result (review, compliance flags, stage summary) is stored on the job.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        with storage.open_db(path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, operator TEXT NOT NULL, options TEXT NOT NULL, "
+                "status TEXT NOT NULL, worker TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+                "submitted_at REAL NOT NULL, started_at REAL, finished_at REAL, "
+                "result TEXT, error TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, submitted_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_logs ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT NOT NULL, line TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS job_logs_job ON job_logs (job_id, seq)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_stream ("
+                "job_id TEXT NOT NULL, stage TEXT NOT NULL, text TEXT NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (job_id, stage))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS workers ("
+                "id TEXT PRIMARY KEY, started_at REAL NOT NULL, heartbeat REAL NOT NULL, "
+                "job_id TEXT, busy_seconds REAL NOT NULL DEFAULT 0)"
+            )
+
+    def _connect(self):
+        return storage.connect(self.path)
+
+    # ---- App side ----
+
+    def submit(self, operator_input, **options):
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, operator, options, status, submitted_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, operator_input, json.dumps(options), time.time())
+            )
+        return job_id
+
+    def get(self, job_id):
+        with self._lock, self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            position = None
+            if row is not None and row["status"] == "queued":
+                position = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND submitted_at < ?",
+                    (row["submitted_at"],)
+                ).fetchone()[0]
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["position"] = position
+        return job
+
+    def logs(self, job_id, after=0):
+        """[(seq, line)] logged for the job after `seq`."""
+        with self._lock, self._connect() as conn:
+            return conn.execute(
+                "SELECT seq, line FROM job_logs WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after)
+            ).fetchall()
+
+    def live_output(self, job_id, chars=4000):
+        """(stage, last `chars` characters) of the most recently streamed stage, or None."""
+        with self._lock, self._connect() as conn:
+            return conn.execute(
+                "SELECT stage, substr(text, -?) FROM job_stream WHERE job_id = ? "
+                "ORDER BY updated_at DESC LIMIT 1",
+                (chars, job_id)
+            ).fetchone()
+
+    def recent(self, limit=10):
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, operator, status, submitted_at, started_at, finished_at "
+                "FROM jobs ORDER BY submitted_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [
+            dict(zip(("id", "operator", "status", "submitted_at", "started_at", "finished_at"), row))
+            for row in rows
+        ]
+
+    def stats(self, window=20):
+        """Queue depth, wait times and worker utilization."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            oldest = conn.execute(
+                "SELECT MIN(submitted_at) FROM jobs WHERE status = 'queued'"
+            ).fetchone()[0]
+            waits = [
+                row[0] for row in conn.execute(
+                    "SELECT started_at - submitted_at FROM jobs WHERE started_at IS NOT NULL "
+                    "ORDER BY started_at DESC LIMIT ?",
+                    (window,)
+                )
+            ]
+            workers = conn.execute(
+                "SELECT w.started_at, w.job_id, w.busy_seconds, j.started_at FROM workers w "
+                "LEFT JOIN jobs j ON j.id = w.job_id WHERE w.heartbeat > ?",
+                (now - STALE_SECONDS,)
+            ).fetchall()
+
+        uptime = sum(now - started_at for started_at, _, _, _ in workers)
+        # Finished jobs plus the time sunk into the ones still running
+        busy_seconds = sum(busy + (now - job_started if job_started else 0) for _, _, busy, job_started in workers)
+        return {
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "avg_wait_seconds": sum(waits) / len(waits) if waits else 0.0,
+            "oldest_wait_seconds": now - oldest if oldest else 0.0,
+            "workers": len(workers),
+            "busy_workers": sum(1 for _, job_id, _, _ in workers if job_id),
+            # Share of worker time spent on reviews since the workers started
+            "utilization": min(1.0, busy_seconds / uptime) if uptime else 0.0,
+        }
+
+    # ---- Worker side ----
+
+    def register(self, worker_id):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO workers (id, started_at, heartbeat, job_id, busy_seconds) "
+                "VALUES (?, ?, ?, NULL, 0)",
+                (worker_id, now, now)
+            )
+
+    def heartbeat(self, worker_id):
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE workers SET heartbeat = ? WHERE id = ?", (time.time(), worker_id))
+
+    def unregister(self, worker_id):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+
+    def claim(self, worker_id):
+        """Move the oldest queued job to running for this worker; None when the queue is empty."""
+        self.requeue_stale()
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            # A single UPDATE is atomic, so two workers can't claim the same job
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, attempts = attempts + 1 "
+                "WHERE id = (SELECT id FROM jobs WHERE status = 'queued' ORDER BY submitted_at LIMIT 1)",
+                (worker_id, now)
+            )
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'running' AND worker = ? AND started_at = ?",
+                (worker_id, now)
+            ).fetchone()
+            if row:
+                conn.execute("UPDATE workers SET job_id = ?, heartbeat = ? WHERE id = ?", (row[0], now, worker_id))
+        return self.get(row[0]) if row else None
+
+    def append_log(self, job_id, line):
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT INTO job_logs (job_id, line) VALUES (?, ?)", (job_id, line))
+
+    def append_stream(self, job_id, texts):
+        """Append streamed output, given as {stage: text}."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO job_stream (job_id, stage, text, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (job_id, stage) DO UPDATE SET "
+                "text = text || excluded.text, updated_at = excluded.updated_at",
+                [(job_id, stage, text, now) for stage, text in texts.items()]
+            )
+
+    def finish(self, job_id, worker_id, result=None, error=None):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            started_at = conn.execute("SELECT started_at FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE id = ?",
+                (
+                    "failed" if error else "done",
+                    now,
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    job_id
+                )
+            )
+            conn.execute(
+                "UPDATE workers SET job_id = NULL, heartbeat = ?, busy_seconds = busy_seconds + ? WHERE id = ?",
+                (now, now - (started_at or now), worker_id)
+            )
+
+    def requeue_stale(self):
+        """Put jobs held by dead workers back on the queue, or fail them after MAX_ATTEMPTS."""
+        cutoff = time.time() - STALE_SECONDS
+        with self._lock, self._connect() as conn:
+            stale = "worker NOT IN (SELECT id FROM workers WHERE heartbeat > ?)"
+            conn.execute(
+                f"UPDATE jobs SET status = 'failed', finished_at = ?, error = 'Worker stopped responding' "
+                f"WHERE status = 'running' AND attempts >= ? AND {stale}",
+                (time.time(), MAX_ATTEMPTS, cutoff)
+            )
+            conn.execute(
+                f"UPDATE jobs SET status = 'queued', worker = NULL, started_at = NULL "
+                f"WHERE status = 'running' AND {stale}",
+                (cutoff,)
+            )
+            conn.execute("DELETE FROM workers WHERE heartbeat <= ?", (cutoff,))
+
+
+class StreamWriter:
+    """
+    Collects streamed LLM output per stage and appends it to the job in
+    batches, so a token-by-token stream costs a write every `interval`
+    seconds rather than one per token.
+    """
+
+    def __init__(self, queue, job_id, interval=0.5):
+        self.queue = queue
+        self.job_id = job_id
+        self.interval = interval
+        self._pending = {}
+        self._flushed = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __call__(self, stage, text):
+        with self._lock:
+            self._pending[stage] = self._pending.get(stage, "") + text
+            due = time.monotonic() - self._flushed >= self.interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed = time.monotonic()
+        if pending:
+            self.queue.append_stream(self.job_id, pending)
+
+
+def run_job(queue, job):
+    from main import PokerReviewCrew
+
+    def write_log(line):
+        queue.append_log(job["id"], line)
+
+    stream = StreamWriter(queue, job["id"])
+    crew = PokerReviewCrew(
+        job["operator"],
+        log_callback=write_log,
+        stream_callback=stream,
+        **job["options"]
+    )
+    try:
+        result = crew.run()
+    finally:
+        stream.flush()
+    result["stage_summary"] = crew.tracer.summary()
+    return result
+
+
+def work(worker_id, path=DEFAULT_PATH, poll_seconds=1.0, llm_semaphore=None, scrape_semaphore=None):
+    """Worker process loop: claim, run, record, repeat."""
+    load_dotenv()
+    limits.configure(llm_semaphore, scrape_semaphore)
+    queue = JobQueue(path)
+    queue.register(worker_id)
+
+    stop = threading.Event()
+
+    def beat():
+        # Keeps the worker alive in the queue's eyes while a long review runs
+        while not stop.wait(HEARTBEAT_SECONDS):
+            queue.heartbeat(worker_id)
+
+    threading.Thread(target=beat, daemon=True).start()
+    try:
+        while True:
+            job = queue.claim(worker_id)
+            if job is None:
+                time.sleep(poll_seconds)
+                continue
+            try:
+                result = run_job(queue, job)
+            except Exception as e:
+                queue.append_log(job["id"], f"❌ Review failed: {e}")
+                queue.append_log(job["id"], traceback.format_exc())
+                queue.finish(job["id"], worker_id, error=str(e))
+            else:
+                queue.finish(job["id"], worker_id, result=result)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        queue.unregister(worker_id)
+
+
+def run_workers(workers=2, path=DEFAULT_PATH, max_llm_calls=8, max_scrapes=16):
+    with multiprocessing.Manager() as manager:
+        # Shared by every worker so the limits hold across the whole pool
+        llm_semaphore = manager.BoundedSemaphore(max_llm_calls)
+        scrape_semaphore = manager.BoundedSemaphore(max_scrapes)
+
+        prefix = f"{socket.gethostname()}-{os.getpid()}"
+        processes = [
+            multiprocessing.Process(
+                target=work,
+                args=(f"{prefix}-{n}", path),
+                kwargs={"llm_semaphore": llm_semaphore, "scrape_semaphore": scrape_semaphore},
+                daemon=True
+            )
+            for n in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        print(f"👷 {workers} review worker(s) polling {path}")
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            pass
+
+
+def start_workers(workers, path=DEFAULT_PATH):
+    """Launch a detached pool, so queued and running reviews outlive the app process."""
+    # The pool runs from the repo directory; relative paths would name different files there
+    return subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--workers", str(workers), "--path", os.path.abspath(path)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=dict(os.environ, SCRAPE_CACHE_DIR=storage.DATA_DIR),
+        start_new_session=True
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run review workers for the Streamlit job queue.")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("JOB_WORKERS", 2) or 2),
+                        help="Reviews running in parallel")
+    parser.add_argument("--path", default=DEFAULT_PATH, help="Queue database")
+    parser.add_argument("--max-llm-calls", type=int, default=8, help="Concurrent LLM calls across all workers")
+    parser.add_argument("--max-scrapes", type=int, default=16, help="Concurrent scrapes across all workers")
+    args = parser.parse_args(argv)
+
+    run_workers(args.workers, args.path, args.max_llm_calls, args.max_scrapes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import os
+import threading
+from contextlib import contextmanager
+
+
+# Per-process defaults; batch runs swap in semaphores shared by every worker
+_llm_semaphore = threading.BoundedSemaphore(int(os.environ.get("MAX_CONCURRENT_LLM_CALLS", 8)))
+_scrape_semaphore = threading.BoundedSemaphore(int(os.environ.get("MAX_CONCURRENT_SCRAPES", 16)))
+
+
+def configure(llm_semaphore=None, scrape_semaphore=None):
+    global _llm_semaphore, _scrape_semaphore
+    if llm_semaphore is not None:
+        _llm_semaphore = llm_semaphore
+    if scrape_semaphore is not None:
+        _scrape_semaphore = scrape_semaphore
+
+
+@contextmanager
+def _hold(semaphore):
+    semaphore.acquire()
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+def llm_slot():
+    return _hold(_llm_semaphore)
+
+
+def scrape_slot():
+    return _hold(_scrape_semaphore)
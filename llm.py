@@ -0,0 +1,130 @@
+import contextvars
+import copy
+import os
+import threading
+from contextlib import contextmanager
+
+from crewai import LLM
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.llm_events import LLMStreamChunkEvent
+
+import cassette
+import limits
+import routing
+import tracing
+from llm_cache import request_key
+
+
+# Stream completions token by token so the UI can show stage output as it is written
+STREAM = os.environ.get("LLM_STREAM", "1") != "0"
+
+_sink = contextvars.ContextVar("stream_sink", default=None)
+
+
+@contextmanager
+def stream_to(callback):
+    """Send the text of every completion made in this context to `callback` as it arrives."""
+    token = _sink.set(callback)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
+
+
+def emit_chunk(llm, text):
+    crewai_event_bus.emit(llm, event=LLMStreamChunkEvent(chunk=text))
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _forward_chunk(source, event):
+    # The bus calls handlers on the emitting thread, so the caller's sink is visible here
+    sink = _sink.get()
+    if sink is not None and event.chunk:
+        sink(event.chunk)
+
+
+class ReviewLLM(LLM):
+    """
+    crewai LLM used by every agent.
+
+    crewai converts LangChain chat models into its own LLM internally, so
+    this is the single place every chat completion passes through.
+
+    cache: optional completion cache (see llm_cache); identical model,
+        temperature, messages and tool schema return the stored response
+
+    Inside a routing context (see routing.use) calls go to the stage's model
+    chain instead of `model`.
+    """
+
+    def __init__(self, *args, cache=None, **kwargs):
+        kwargs.setdefault("stream", STREAM)
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+        self.pinned = False
+        self._variants = {}
+        self._variants_lock = threading.Lock()
+
+    def variant(self, model, timeout=None):
+        """This client with another model and timeout; ignores routing."""
+        with self._variants_lock:
+            key = (model, timeout)
+            if key not in self._variants:
+                clone = copy.copy(self)
+                clone.model = model
+                clone.timeout = timeout or self.timeout
+                clone.pinned = True
+                self._variants[key] = clone
+            return self._variants[key]
+
+    def call(self, messages, tools=None, *args, **kwargs):
+        if not self.pinned and routing.active() is not None:
+            return routing.call(self, messages, tools, *args, **kwargs)
+
+        with tracing.span(self.model, "llm", model=self.model, retries=0) as span:
+            # A replay is answered by its recording alone, not by whatever the cache holds now
+            cache = None if cassette.replaying() else self.cache
+            key = None
+            if cache is not None or cassette.active() is not None:
+                key = request_key(self.model, self.temperature, messages, tools)
+            if cache is not None:
+                cached = cache.get(key)
+                if cached is not None:
+                    cassette.seen("llm", key, cached)
+                    self._forward(cached)
+                    self._record(span, messages, cached, cached=True)
+                    return cached
+
+            with limits.llm_slot():
+                response = cassette.through("llm", key, lambda: self._complete(messages, tools, *args, **kwargs))
+            if cassette.replaying():
+                self._forward(response)
+
+            if cache is not None and isinstance(response, str) and response:
+                cache.set(key, response)
+            self._record(span, messages, response, cached=False)
+            return response
+
+    @staticmethod
+    def _forward(text):
+        # Answers that never went through the model still reach the stream sink
+        sink = _sink.get()
+        if sink is not None and isinstance(text, str):
+            sink(text)
+
+    def _complete(self, messages, tools=None, *args, **kwargs):
+        return super().call(messages, tools, *args, **kwargs)
+
+    def _record(self, span, messages, response, cached):
+        if span is None:
+            return
+        prompt_tokens = tracing.estimate_tokens(messages)
+        completion_tokens = tracing.estimate_tokens(response)
+        span.set(
+            cached=cached,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost_usd=0.0 if cached else tracing.estimate_cost(self.model, prompt_tokens, completion_tokens),
+            request_bytes=len(str(messages)),
+            response_bytes=len(str(response)),
+        )
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import storage
+
+
+# LLM_CACHE: "all" caches every agent, "precise-only" leaves creative stages
+# uncached so they can still vary between runs, "off" disables caching
+CACHE_POLICY = os.environ.get("LLM_CACHE", "all")
+CACHE_BACKEND = os.environ.get("LLM_CACHE_BACKEND", "sqlite")
+MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 5000))
+
+
+def request_key(model, temperature, messages, tools=None):
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": messages, "tools": tools},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteLLMCache:
+    """Completions in one SQLite file, least recently used evicted past `max_entries`."""
+
+    def __init__(self, path=None, max_entries=MAX_ENTRIES):
+        self.path = path or storage.data_path("llm.sqlite3")
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        with storage.open_db(self.path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, last_access REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return storage.connect(self.path)
+
+    def get(self, key):
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT response FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def set(self, key, response):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO completions (key, response, last_access) VALUES (?, ?, ?)",
+                (key, response, time.time())
+            )
+            conn.execute(
+                "DELETE FROM completions WHERE key IN ("
+                "SELECT key FROM completions ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+
+class FileLLMCache:
+    """One JSON file per completion; oldest files evicted past `max_entries`."""
+
+    def __init__(self, directory=None, max_entries=MAX_ENTRIES):
+        self.directory = directory or storage.data_path("llm")
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                response = json.load(f)["response"]
+            os.utime(self._path(key))
+        except (OSError, ValueError, KeyError):
+            return None
+        return response
+
+    def set(self, key, response):
+        with self._lock:
+            with open(self._path(key), "w", encoding="utf-8") as f:
+                json.dump({"response": response}, f)
+
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)]
+            if len(paths) > self.max_entries:
+                paths.sort(key=os.path.getmtime)
+                for path in paths[:len(paths) - self.max_entries]:
+                    os.remove(path)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Process-wide completion cache, or None when LLM_CACHE=off."""
+    global _cache
+    if CACHE_POLICY == "off":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = FileLLMCache() if CACHE_BACKEND == "file" else SQLiteLLMCache()
+        return _cache
+
+
+def cache_creative():
+    return CACHE_POLICY == "all"
@@ -1,33 +1,198 @@
-from crewai import Crew, Process
-from agents import SEOCrewAgents
-from tasks import SEOCrewTasks
+from crewai.tasks.task_output import TaskOutput
+from resources import get_crew_agents
+from tasks import SEOCrewTasks, stage_market
+from scheduler import TaskGraphScheduler
+from checkpoints import CheckpointStore, task_config_hash
+from tracing import Tracer
+from revisions import RevisionStore, text_fingerprint
+from facts import FactStore, keyword_section, section_fact_paths
+from sections import merge_sections, replace_sections, split_outline
+from compliance_scan import flagged_block, parse_rewrites, scan
+from concurrent.futures import ThreadPoolExecutor
+import cassette
+from cassette import Cassette
+import contextlib
+import contextvars
+import routing
+import tracing
+from llm import stream_to
+from tools.chunks import select_chunks
+from tools.http_cache import get_default_cache
+from tools.knowledge import get_default_index, operator_scope
+from tools.prefetch import Prefetcher
+from tools.resilience import guards
+from tools.search import search_cache
 import datetime
+import os
+import re
+import time
 
 class PokerReviewCrew:
-    def __init__(self, operator_input, log_callback=None):
+    def __init__(self, operator_input, log_callback=None, workers=None, checkpoints=None,
+                 refresh_from=None, trace_dir=None, agents=None, section_workers=None,
+                 jurisdiction=None, stream_callback=None, prefetch=None, cassette=None,
+                 cassette_mode=None, replay_latency=None, jurisdictions=None, localize_seo=None,
+                 incremental=None, revisions=None):
         """
         operator_input: Operator name or URL
+        workers: Max stages running at once (defaults to CREW_WORKERS, else 2
+            or one per market)
+        checkpoints: Reuse stored stage outputs whose inputs are unchanged and
+            that are younger than CHECKPOINT_MAX_AGE seconds (defaults to on
+            unless CREW_CHECKPOINTS=0)
+        refresh_from: Stage name to force-rerun along with every stage after it
+        trace_dir: Directory for span exports (JSON lines + Chrome trace),
+            defaults to CREW_TRACE_DIR; nothing is written when unset
+        agents: SEOCrewAgents to build this run's agents from; defaults to the
+            process-wide instance so tools and LLM clients are reused
+        section_workers: Outline sections written concurrently in the writing
+            stage (defaults to WRITER_SECTION_WORKERS or 6; 0 writes the
+            article in a single call)
+        jurisdiction: Compliance rule pack layered over the base rules, e.g.
+            "uk", "us" or "ontario" (defaults to COMPLIANCE_JURISDICTION)
+        stream_callback: called as (stage, text) with each piece of LLM output
+            as it is generated
+        prefetch: warm the search and scrape caches with the operator's
+            predictable queries and homepage while the first stages start
+            (defaults to on unless PREFETCH=0)
+        cassette: file to record every LLM, search, page and knowledge exchange
+            to, or to replay them from without touching the network (defaults
+            to CASSETTE; nothing is recorded when unset)
+        cassette_mode: "record" or "replay" (defaults to CASSETTE_MODE, else
+            replay when the file exists and record when it doesn't). A replay
+            skips checkpoints and the LLM, search and scrape caches, and writes
+            nothing to them or to the revision store or knowledge index
+        replay_latency: fraction of the recorded timings to reproduce in
+            replay (defaults to CASSETTE_LATENCY or 0, i.e. full speed)
+        jurisdictions: markets to publish in, e.g. ["uk", "us", "ontario"]
+            (defaults to the comma-separated COMPLIANCE_JURISDICTIONS). With
+            more than one, research, SERP, outline and writing run once and
+            compliance and editorial run per market, concurrently
+        localize_seo: also fork the SEO stage per market for localized
+            keywords (defaults to on when LOCALIZE_SEO=1)
+        incremental: refresh the last publication instead of rewriting it:
+            re-check its sources and rewrite only the sections whose facts
+            changed (defaults to on when CREW_INCREMENTAL=1)
+        revisions: record source and fact fingerprints and the published
+            article after each run, for later refreshes (defaults to on
+            unless CREW_REVISIONS=0)
         """
         self.operator_input = operator_input
+        if jurisdictions is None:
+            jurisdictions = os.environ.get("COMPLIANCE_JURISDICTIONS", "").split(",")
+        markets = list(dict.fromkeys(market.strip().lower() for market in jurisdictions if market.strip()))
+        if len(markets) == 1:
+            # One market is a plain run under its rule pack
+            jurisdiction = jurisdiction or markets[0]
+            markets = []
+        self.markets = markets
+        if localize_seo is None:
+            localize_seo = os.environ.get("LOCALIZE_SEO", "0") == "1"
+        self.localize_seo = localize_seo
+        self.workers = workers or int(os.environ.get("CREW_WORKERS", 0)) or max(2, len(self.markets))
+        if checkpoints is None:
+            checkpoints = os.environ.get("CREW_CHECKPOINTS", "1") != "0"
+        self.checkpoints = CheckpointStore() if checkpoints else None
+        self.refresh_from = refresh_from
+        if incremental is None:
+            incremental = os.environ.get("CREW_INCREMENTAL", "0") == "1"
+        self.incremental = incremental
+        if revisions is None:
+            revisions = os.environ.get("CREW_REVISIONS", "1") != "0"
+        self.revisions = RevisionStore() if revisions else None
+        self.forced = set()
+        # Stage name -> when the checkpoint it reused was saved
+        self.resumed = {}
+        # Stage name -> extra context, e.g. the pages a refresh found changed
+        self.notes = {}
+        self.tracer = Tracer()
+        self.facts = None
+        if section_workers is None:
+            section_workers = int(os.environ.get("WRITER_SECTION_WORKERS", 6))
+        self.section_workers = section_workers
+        self.jurisdiction = jurisdiction or os.environ.get("COMPLIANCE_JURISDICTION") or None
+        # Market (None for a single-market run) -> flags from its compliance pre-scan
+        self.compliance_flags = {}
+        self.trace_dir = trace_dir or os.environ.get("CREW_TRACE_DIR")
         self.current_year = datetime.datetime.now().year
-        self.agents = SEOCrewAgents()
+        self.agents = agents or get_crew_agents()
         self.tasks = SEOCrewTasks()
         self.log_callback = log_callback or (lambda x: None)
+        self.stream_callback = stream_callback
+        if prefetch is None:
+            prefetch = os.environ.get("PREFETCH", "1") != "0"
+        self.prefetch = prefetch
+        self.prefetcher = None
+        # Cache and rate-limit counters when the run started; the run reports its change in them
+        self.counters_at_start = {}
+        self.cassette = None
+        path = cassette or os.environ.get("CASSETTE")
+        if path:
+            mode = cassette_mode or os.environ.get("CASSETTE_MODE") or (
+                "replay" if os.path.exists(path) else "record"
+            )
+            if replay_latency is None:
+                replay_latency = float(os.environ.get("CASSETTE_LATENCY", 0))
+            self.cassette = Cassette(path, mode, latency=replay_latency)
+            if self.cassette.mode == "replay":
+                # Hermetic replays: no stage is answered from a checkpoint, and none of the run is stored
+                self.checkpoints = None
+                self.revisions = None
 
     def log(self, message):
         print(message)
         self.log_callback(message)
 
     def run(self):
+        token = self.tracer.activate()
+        self.counters_at_start = self.cache_counters()
+        try:
+            # Pages, searches and facts indexed during the run are tagged with the operator
+            with operator_scope(self.operator_input), self.recording():
+                if self.prefetch:
+                    self.prefetcher = Prefetcher(self.operator_input, scrape_tool=self.agents.scrape_tool)
+                    self.prefetcher.start()
+                try:
+                    return self._run()
+                finally:
+                    if self.prefetcher:
+                        self.prefetcher.stop()
+        finally:
+            self.tracer.deactivate(token)
+
+    @contextlib.contextmanager
+    def recording(self):
+        if self.cassette is None:
+            yield
+            return
+        self.log(f"📼 Cassette {self.cassette.mode}: {self.cassette.path}")
+        try:
+            with cassette.use(self.cassette):
+                yield
+        finally:
+            # Failed runs are saved too; they are the ones worth replaying
+            self.cassette.save()
+            stats = self.cassette.stats()
+            if stats["mode"] == "record":
+                self.log(f"📼 Recorded {stats['recorded']} exchanges to {self.cassette.path}")
+            else:
+                self.log(
+                    f"📼 Replayed {stats['replayed']} exchanges ({stats['drifted']} drifted prompts, "
+                    f"{stats['misses']} missing from the recording)"
+                )
+
+    def _run(self):
+        if self.incremental:
+            result = self.refresh()
+            if result is not None:
+                return result
+
         self.log("👤 Initializing Poker Review Agents...")
 
         researcher = self.agents.operator_researcher()
         serp_agent = self.agents.serp_intelligence_agent()
         architect = self.agents.review_architect()
         writer = self.agents.review_writer()
-        seo_optimizer = self.agents.seo_optimizer()
-        compliance = self.agents.compliance_agent()
-        editor = self.agents.editorial_supervisor()
 
         self.log("📌 Defining Poker Review Tasks...")
 
@@ -40,8 +205,7 @@ class PokerReviewCrew:
         # 2️⃣ SERP Intelligence
         serp_task = self.tasks.serp_analysis_task(
             serp_agent,
-            self.operator_input,
-            research_task
+            self.operator_input
         )
 
         # 3️⃣ Outline Architecture
@@ -60,55 +224,578 @@ class PokerReviewCrew:
             outline_task
         )
 
-        # 5️⃣ SEO Optimization
-        seo_task = self.tasks.seo_optimization_task(
-            seo_optimizer,
-            self.operator_input,
-            writing_task,
-            serp_task
+        all_tasks = [research_task, serp_task, outline_task, writing_task]
+
+        # 5️⃣ SEO Optimization (shared unless localized per market)
+        seo_task = None
+        if not (self.markets and self.localize_seo):
+            seo_task = self.tasks.seo_optimization_task(
+                self.agents.seo_optimizer(),
+                self.operator_input,
+                writing_task,
+                serp_task
+            )
+            all_tasks.append(seo_task)
+
+        if self.markets:
+            forked = "SEO, compliance and editorial" if self.localize_seo else "compliance and editorial"
+            self.log(f"🌍 Forking {forked} for {len(self.markets)} markets: {', '.join(self.markets)}")
+
+        # 6️⃣ Compliance Review and 7️⃣ Final Editorial Packaging, once per market
+        final_tasks = {}
+        for market in self.markets or [None]:
+            market_seo_task = seo_task or self.tasks.seo_optimization_task(
+                self.agents.seo_optimizer(),
+                self.operator_input,
+                writing_task,
+                serp_task,
+                market=market
+            )
+            compliance_task = self.tasks.compliance_review_task(
+                self.agents.compliance_agent(),
+                self.operator_input,
+                market_seo_task,
+                market=market
+            )
+            final_tasks[market] = self.tasks.editorial_packaging_task(
+                self.agents.editorial_supervisor(),
+                self.operator_input,
+                compliance_task,
+                market=market
+            )
+            if market_seo_task is not seo_task:
+                all_tasks.append(market_seo_task)
+            all_tasks += [compliance_task, final_tasks[market]]
+
+        self.log("🚀 Kicking off Poker Review Crew...")
+
+        self.task_map = {task.name: task for task in all_tasks}
+
+        # Each stage starts as soon as the stages it depends on are done
+        scheduler = TaskGraphScheduler(
+            self.tasks.depends_on,
+            self.execute_task,
+            workers=self.workers,
+            log=self.log
+        )
+        if self.refresh_from:
+            # A base stage name covers every market's fork of it
+            stages = [name for name in self.task_map if stage_market(name)[0] == self.refresh_from]
+            for stage in stages or [self.refresh_from]:
+                self.forced |= scheduler.descendants(stage)
+        self.task_outputs = scheduler.run()
+
+        self.log("✅ Poker Review process completed.")
+        self.log_cache_stats()
+        self.export_trace()
+
+        articles = {market: self.task_outputs[task.name].raw for market, task in final_tasks.items()}
+        self.record_publication(self.task_outputs[outline_task.name].raw, articles)
+        return self.package(articles)
+
+    def package(self, articles, refreshed=None):
+        """The run's result for each market; with several, the first also fills the top level."""
+        results = {}
+        for market, article in articles.items():
+            results[market] = {
+                "final_review": article,
+                "meta": {},
+                "compliance_flags": self.compliance_flags.get(market, []),
+                "editor_summary": "",
+                "resumed_stages": dict(self.resumed)
+            }
+            if refreshed is not None:
+                results[market]["refreshed_sections"] = refreshed.get(market, [])
+        if not self.markets:
+            return results[None]
+        # The first market doubles as the top-level result for single-review callers
+        return dict(results[self.markets[0]], markets=results)
+
+    def fetch_sources(self, urls, revalidate=False):
+        """{url: main text} of the pages that could be fetched."""
+        urls = sorted(urls)
+        if not urls:
+            return {}
+        texts = self.agents.scrape_tool.scrape_many(urls, revalidate=revalidate)
+        return {url: text for url, text in zip(urls, texts) if not text.startswith("Error scraping website")}
+
+    def source_fingerprints(self, urls, revalidate=False):
+        """{url: fingerprint} of the pages that could be fetched."""
+        return {url: text_fingerprint(text) for url, text in self.fetch_sources(urls, revalidate).items()}
+
+    def record_publication(self, outline, articles, checked=None):
+        """Store what this publication was built from, so the next refresh can diff against it."""
+        if self.revisions is None or self.facts is None or not self.facts.parsed:
+            return
+        try:
+            self._record_publication(outline, articles, checked)
+        except Exception as e:
+            # The review itself is done; losing its refresh baseline only means the next run is a full one
+            self.log(f"⚠️ Could not record this publication for refreshes: {e}")
+
+    def _record_publication(self, outline, articles, checked):
+        facts = self.facts.facts
+        urls = {
+            url
+            for fact in facts
+            # Research sometimes cites a list of pages for one fact
+            for url in (fact.source_url if isinstance(fact.source_url, list) else [fact.source_url])
+            if isinstance(url, str) and re.match(r"^https?://", url)
+        }
+        # Pages re-checked during a refresh aren't fetched again
+        fingerprints = {url: value for url, value in (checked or {}).items() if url in urls}
+        fingerprints.update(self.source_fingerprints(urls - fingerprints.keys()))
+
+        self.revisions.save_sources(self.operator_input, fingerprints)
+        self.revisions.save_facts(self.operator_input, facts)
+        for market, article in articles.items():
+            _, sections = split_outline(article)
+            self.revisions.publish(
+                self.operator_input,
+                market,
+                outline,
+                article,
+                {heading: section_fact_paths(heading, body, facts) for heading, body in sections}
+            )
+        self.log(f"🗂️ Recorded {len(fingerprints)} source and {len(facts)} fact fingerprints for refreshes")
+
+    def refresh(self):
+        """
+        Bring the last publication up to date instead of rewriting it. Its
+        sources are re-checked with conditional requests; only when one changed
+        (or can't be fetched) does research run again, with the changed pages
+        re-indexed and in its context. The new facts are diffed against the
+        stored ones, the sections that relied on a changed fact are rewritten
+        in each market's edition, and that market's compliance runs over just
+        those sections. Returns None when there is no publication to refresh,
+        so the full review runs instead.
+        """
+        if self.revisions is None:
+            self.log("🔁 Revisions are off (CREW_REVISIONS=0 or a cassette replay), running the full review")
+            return None
+        markets = self.markets or [None]
+        previous = {market: self.revisions.publication(self.operator_input, market) for market in markets}
+        if any(publication is None for publication in previous.values()):
+            self.log("🔁 No earlier publication to refresh, running the full review")
+            return None
+        outline = previous[markets[0]]["outline"]
+        articles = {market: publication["article"] for market, publication in previous.items()}
+
+        sources = self.revisions.sources(self.operator_input)
+        pages = self.fetch_sources(sources, revalidate=True)
+        checked = {url: text_fingerprint(text) for url, text in pages.items()}
+        changed_sources = [url for url, value in checked.items() if sources[url] != value]
+        # A page that can't be fetched may have changed too; only research can tell
+        unreachable = sorted(url for url in sources if url not in checked)
+        self.log(f"🔁 Re-checked {len(checked)}/{len(sources)} sources: {len(changed_sources)} changed")
+        if unreachable:
+            self.log(f"⚠️ {len(unreachable)} source(s) could not be re-checked, researching again: {', '.join(unreachable)}")
+        if sources and not changed_sources and not unreachable:
+            self.log("✅ No source changed since the last publication; nothing to rewrite")
+            return self.package(articles, refreshed={})
+
+        # Research starts from the knowledge index, which still holds the old pages and the facts taken from them
+        index = get_default_index()
+        if index is not None:
+            try:
+                index.drop_facts(changed_sources + unreachable)
+                for url in changed_sources:
+                    index.add_page(url, pages[url])
+            except Exception as e:
+                self.log(f"⚠️ Could not re-index the changed sources: {e}")
+
+        research_task = self.tasks.operator_research_task(self.agents.operator_researcher(), self.operator_input)
+        self.task_map = {research_task.name: research_task}
+        # The stored research predates the change
+        self.forced = {research_task.name}
+        notes = []
+        if changed_sources:
+            notes.append("Sources changed since the last publication; take their facts from this text:\n\n" + (
+                "\n\n".join(f"### {url}\n{select_chunks(pages[url])}" for url in changed_sources)
+            ))
+        if unreachable:
+            notes.append("Sources that could not be re-fetched; confirm their facts elsewhere:\n"
+                         + "\n".join(f"- {url}" for url in unreachable))
+        self.notes[research_task.name] = "\n\n".join(notes)
+        try:
+            self.execute_task(research_task.name, {})
+        finally:
+            self.forced = set()
+            self.notes.pop(research_task.name, None)
+        if not self.facts.parsed:
+            self.log("⚠️ Research output unparseable, running the full review")
+            return None
+
+        facts = self.facts.facts
+        changed = self.revisions.changed_facts(self.operator_input, facts)
+        affected = {}
+        for market, publication in previous.items():
+            _, sections = split_outline(publication["article"])
+            affected[market] = {
+                heading: body
+                for heading, body in sections
+                # Paths stored at publish time catch facts whose old value the text quotes
+                if changed & (set(publication["sections"].get(heading, []))
+                              | set(section_fact_paths(heading, body, facts)))
+            }
+        headings = list(dict.fromkeys(heading for sections in affected.values() for heading in sections))
+
+        if not headings:
+            self.log(f"✅ {len(changed)} fact(s) changed, none used by a published section; nothing to rewrite")
+            self.record_publication(outline, articles, checked)
+            return self.package(articles, refreshed={})
+        self.log(
+            f"🔁 {len(changed)} fact(s) changed ({', '.join(sorted(changed)[:8])}"
+            f"{', …' if len(changed) > 8 else ''}); rewriting {len(headings)} section(s): {', '.join(headings)}"
+        )
+
+        current = {fact.path: fact for fact in facts}
+        changes = "\n".join(
+            current[path].render() if path in current else f"- {path}: no longer reported"
+            for path in sorted(changed)
+        )
+        outline_sections = {heading.lower(): body for heading, body in split_outline(outline)[1]}
+        facts_block = self.facts.render()
+
+        def rewrite(market, heading):
+            # Each market's edition is updated from its own text, disclaimers and compliance edits included
+            published = affected[market][heading]
+            context = (
+                f"{facts_block}\n\nFacts changed since the last publication:\n{changes}\n\n"
+                f"Full approved outline:\n{outline}\n\n"
+                "Currently published version of this section. Keep what is still accurate and update "
+                f"only what the changed facts affect:\n{published}"
+            )
+            return self.write_section(heading, outline_sections.get(heading.lower(), ""), context)[1]
+
+        jobs = [(market, heading) for market, sections in affected.items() for heading in sections]
+        workers = max(1, min(self.section_workers or 1, len(jobs)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {job: executor.submit(contextvars.copy_context().run, rewrite, *job) for job in jobs}
+            rewritten = {job: future.result() for job, future in futures.items()}
+
+        # Compliance over the diff only: the rewritten sections, plus the article-wide disclaimer check
+        for market, sections in affected.items():
+            if not sections:
+                continue
+            flags = []
+            bodies = {}
+            for heading in sections:
+                text = rewritten[market, heading]
+                result = scan(text, market or self.jurisdiction)
+                flags += [str(flag) for flag in result.flags if flag.paragraph >= 0]
+                if result.flagged_paragraphs:
+                    paragraphs = self.rewrite_flagged(self.agents.compliance_agent(), result)
+                    if paragraphs is not None:
+                        text = "\n\n".join(paragraphs)
+                bodies[heading] = text
+            article = replace_sections(articles[market], bodies)
+            full = scan(article, market or self.jurisdiction)
+            if full.missing_disclaimers:
+                article = article.rstrip() + "\n\n" + "\n\n".join(d.strip() for d in full.pack.disclaimers) + "\n"
+                flags += [str(flag) for flag in full.missing_disclaimers]
+            self.log(f"⚖️ Compliance on {len(bodies)} rewritten section(s) ({full.pack.name}): {len(flags)} flag(s)")
+            self.compliance_flags[market] = flags
+            articles[market] = article
+
+        self.record_publication(outline, articles, checked)
+        self.log(f"✅ Refreshed {len(headings)} section(s) instead of rewriting the review")
+        self.log_cache_stats()
+        self.export_trace()
+        return self.package(articles, refreshed={market: list(sections) for market, sections in affected.items()})
+
+    def execute_task(self, name, upstream):
+        route = self.tasks.routes.get(name)
+        with tracing.span(name, "task") as span, routing.use(name, route, self.log), self.streaming(name):
+            output = self._execute_task(name, upstream)
+            if span:
+                span.set(response_bytes=len(output.raw))
+
+        if name == "operator_research_task":
+            # Parsed once; later stages get only the facts they declare
+            self.facts = FactStore.from_output(output.raw)
+            index = get_default_index()
+            if index is not None and self.facts.parsed:
+                try:
+                    index.add_facts(self.facts.facts)
+                except Exception as e:
+                    # The index only helps later runs; it must not fail this one
+                    self.log(f"⚠️ Could not index the research facts: {e}")
+        return output
+
+    def streaming(self, stage):
+        if self.stream_callback is None:
+            return contextlib.nullcontext()
+        return stream_to(lambda text: self.stream_callback(stage, text))
+
+    def build_context(self, name, upstream):
+        inputs = self.tasks.inputs.get(name, {})
+        parts = []
+        for dep, output in upstream.items():
+            if dep == "operator_research_task" and "facts" in inputs:
+                continue
+            if dep == "serp_analysis_task" and inputs.get("serp") == "keywords":
+                parts.append(keyword_section(output.raw))
+            else:
+                parts.append(output.raw)
+
+        if "facts" in inputs and self.facts is not None:
+            spec = inputs["facts"]
+            parts.insert(0, self.facts.render(spec.get("topics"), spec.get("detail", True)))
+        if name in self.notes:
+            parts.append(self.notes[name])
+
+        return "\n\n".join(parts)
+
+    def _execute_task(self, name, upstream):
+        task = self.task_map[name]
+        context = self.build_context(name, upstream)
+
+        full_size = sum(len(output.raw) for output in upstream.values())
+        if full_size > len(context):
+            self.log(f"✂️ {name}: context {len(context)} chars (full upstream {full_size})")
+
+        base, market = stage_market(name)
+        scan_result = None
+        if base == "compliance_review_task":
+            article = next(output.raw for dep, output in upstream.items()
+                           if stage_market(dep)[0] == "seo_optimization_task")
+            scan_result = self.prescan(article, market)
+
+        inputs = [context]
+        if scan_result is not None:
+            # The rule pack shapes the output as much as the upstream text does
+            inputs.append(scan_result.pack.name)
+
+        key = None
+        if self.checkpoints:
+            key = self.checkpoints.key(self.operator_input, name, task_config_hash(task, self.tasks.routes.get(name)), inputs)
+            stored = None if name in self.forced else self.checkpoints.load(key)
+            if stored is not None:
+                raw, saved_at = stored
+                self.resumed[name] = saved_at
+                self.log(f"⏭️ Reusing checkpoint for {name} (saved {(time.time() - saved_at) / 60:.0f} min ago)")
+                return TaskOutput(
+                    name=name,
+                    description=task.description,
+                    expected_output=task.expected_output,
+                    raw=raw,
+                    agent=task.agent.role
+                )
+
+        output = None
+        if name == "review_writing_task" and self.section_workers:
+            output = self.write_sections(task, upstream["review_outline_task"].raw)
+        if scan_result is not None:
+            output = self.review_compliance(task, scan_result)
+        if output is None:
+            if scan_result is not None and scan_result.flags:
+                flags = "\n".join(f"- {flag}" for flag in scan_result.flags)
+                context = f"{context}\n\nRule-based scan flags:\n{flags}"
+            output = task.execute_sync(
+                agent=task.agent,
+                context=context or None,
+                tools=task.tools or task.agent.tools or []
+            )
+
+        if key:
+            self.checkpoints.save(key, self.operator_input, name, output.raw)
+        return output
+
+    def prescan(self, article, market=None):
+        started = time.perf_counter()
+        with tracing.span("compliance_scan", "tool") as span:
+            result = scan(article, market or self.jurisdiction)
+            if span:
+                span.set(flags=len(result.flags))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.compliance_flags[market] = result.as_strings()
+        self.log(
+            f"⚖️ Compliance pre-scan ({result.pack.name}): {len(result.flags)} flag(s) in "
+            f"{len(result.flagged_paragraphs)} paragraph(s), {elapsed_ms:.0f} ms"
         )
+        return result
+
+    def review_compliance(self, task, result):
+        """
+        Resolve the compliance stage from the local scan: a clean article passes
+        through untouched, flagged paragraphs are rewritten by the LLM one span
+        at a time, and missing disclaimers are appended from the rule pack.
+        Returns None when the LLM reply can't be mapped back to paragraphs, so
+        the caller falls back to a full-article review.
+        """
+        paragraphs = list(result.paragraphs)
 
-        # 6️⃣ Compliance Review
-        compliance_task = self.tasks.compliance_review_task(
-            compliance,
+        if result.flagged_paragraphs:
+            paragraphs = self.rewrite_flagged(task.agent, result)
+            if paragraphs is None:
+                self.log("⚠️ Compliance rewrite unparseable, reviewing the full article")
+                return None
+        else:
+            self.log("⚖️ No risky phrasing found, skipping the LLM compliance pass")
+
+        for flag in result.missing_disclaimers:
+            self.log(f"⚖️ Added missing disclaimer: {flag.message}")
+        if result.missing_disclaimers:
+            paragraphs.extend(text.strip() for text in result.pack.disclaimers)
+
+        return TaskOutput(
+            name=task.name,
+            description=task.description,
+            expected_output=task.expected_output,
+            raw="\n\n".join(paragraphs) + "\n",
+            agent=task.agent.role
+        )
+
+    def rewrite_flagged(self, agent, result):
+        """
+        The scanned paragraphs with each flagged one rewritten by the LLM in a
+        single call, or None when the reply can't be mapped back to them.
+        """
+        spans_task = self.tasks.compliance_spans_task(
+            agent,
             self.operator_input,
-            seo_task
+            flagged_block(result)
+        )
+        facts = self.facts.render(["bonus", "rakeback", "licensing"]) if self.facts is not None else ""
+        reply = spans_task.execute_sync(
+            agent=spans_task.agent,
+            context=facts or None,
+            tools=[]
         )
+        rewrites = {
+            index: text
+            for index, text in parse_rewrites(reply.raw).items()
+            if index in result.flagged_paragraphs
+        }
+        if not rewrites:
+            return None
+        paragraphs = list(result.paragraphs)
+        for index, text in rewrites.items():
+            paragraphs[index] = text
+        self.log(f"⚖️ Rewrote {len(rewrites)} flagged paragraph(s)")
+        return paragraphs
 
-        # 7️⃣ Final Editorial Packaging
-        final_task = self.tasks.editorial_packaging_task(
-            editor,
+    def write_section(self, heading, section_outline, context):
+        section_task = self.tasks.review_section_task(
+            self.agents.review_writer(),
             self.operator_input,
-            compliance_task
+            heading,
+            section_outline,
+            self.agents.audience_tone
         )
+        with tracing.span(section_task.name, "task"), self.streaming(section_task.name):
+            result = section_task.execute_sync(
+                agent=section_task.agent,
+                context=context,
+                tools=section_task.agent.tools or []
+            )
+        return heading, result.raw
 
-        self.log("🚀 Kicking off Poker Review Crew...")
+    def write_sections(self, task, outline):
+        """
+        Write each outline section as its own concurrent generation sharing the
+        research facts, full outline and tone brief, then merge them in outline
+        order. Returns None when the outline has too few sections to split.
+        """
+        title, sections = split_outline(outline)
+        if len(sections) < 2:
+            return None
 
-        crew = Crew(
-            agents=[
-                researcher,
-                serp_agent,
-                architect,
-                writer,
-                seo_optimizer,
-                compliance,
-                editor
-            ],
-            tasks=[
-                research_task,
-                serp_task,
-                outline_task,
-                writing_task,
-                seo_task,
-                compliance_task,
-                final_task
-            ],
-            process=Process.sequential
+        self.log(f"✍️ Writing {len(sections)} sections in parallel...")
+        facts = self.facts.render() if self.facts is not None else ""
+        context = f"{facts}\n\nFull approved outline:\n{outline}".strip()
+
+        workers = min(self.section_workers, len(sections))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, self.write_section, heading, section_outline, context)
+                for heading, section_outline in sections
+            ]
+            parts = [future.result() for future in futures]
+
+        return TaskOutput(
+            name=task.name,
+            description=task.description,
+            expected_output=task.expected_output,
+            raw=merge_sections(title, parts),
+            agent=task.agent.role
         )
 
-        result = crew.kickoff()
+    def export_trace(self):
+        if not self.trace_dir:
+            return
+        slug = re.sub(r"[^a-z0-9]+", "-", self.operator_input.lower()).strip("-")
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        base = self.tracer.export(self.trace_dir, f"{slug}-{stamp}")
+        self.log(f"🧭 Trace written to {base}.trace.json")
 
-        self.log("✅ Poker Review process completed.")
-        return result
+    def cache_counters(self):
+        """
+        Counters the caches and rate limiters keep for the whole process (the
+        scrape cache's for every process sharing its file).
+        """
+        cache = get_default_cache()
+        return {
+            "search": search_cache.stats(),
+            "search:": guards.totals("search:"),
+            "host:": guards.totals("host:"),
+            "scrape": cache.stats() if cache is not None else {},
+        }
+
+    def run_counters(self):
+        """This run's share of `cache_counters`; runs overlapping in the same process still blend."""
+        before = self.counters_at_start
+        return {
+            name: {key: value - before.get(name, {}).get(key, 0) for key, value in counters.items()}
+            for name, counters in self.cache_counters().items()
+        }
+
+    def log_cache_stats(self):
+        counters = self.run_counters()
+        stats = counters["search"]
+        lookups = stats["hits"] + stats["coalesced"] + stats["misses"]
+        self.log(
+            f"🔎 Search cache: {stats['hits']} hits, {stats['coalesced']} coalesced, {stats['misses']} misses "
+            f"({(stats['hits'] + stats['coalesced']) / lookups if lookups else 0:.0%} hit rate)"
+        )
+
+        for prefix, label in (("search:", "Search"), ("host:", "Scrape")):
+            totals = counters[prefix]
+            if not totals.get("calls"):
+                continue
+            self.log(
+                f"🚦 {label} limits: {totals['calls']:.0f} calls, {totals['throttled']:.0f} throttled "
+                f"({totals['wait_seconds']:.1f}s waited), {totals['retries']:.0f} retries, "
+                f"{totals['circuit_opens']:.0f} circuit opens, {totals['short_circuited']:.0f} short-circuited"
+            )
+
+        if self.prefetcher is not None:
+            stats = self.prefetcher.stats()
+            if stats["searches"] or stats["pages"]:
+                self.log(
+                    f"🔮 Prefetch: {stats['searches']} searches + {stats['pages']} pages, "
+                    f"{stats['hits']} used by agents ({stats['hit_rate']:.0%}), {stats['wasted']} wasted, "
+                    f"{stats['failed']} failed"
+                    + (f", done in {stats['seconds']:.1f}s" if not stats["pending"] else "")
+                )
+
+        index = get_default_index()
+        if index is not None:
+            stats = index.stats()
+            self.log(
+                f"📚 Knowledge index: {stats['pages']} pages, {stats['searches']} searches, "
+                f"{stats['facts']} facts across {stats['operators']} operators"
+            )
+
+        stats = counters["scrape"]
+        if not stats:
+            return
+        lookups = stats["hits"] + stats["revalidated"] + stats["misses"]
+        self.log(
+            f"🗄️ Scrape cache: {stats['hits']} hits, {stats['revalidated']} revalidated, "
+            f"{stats['misses']} misses ({(stats['hits'] + stats['revalidated']) / lookups if lookups else 0:.0%} "
+            f"hit rate, ~{stats['saved_seconds']:.1f}s fetch/parse saved)"
+        )
 
 
@@ -0,0 +1,24 @@
+import threading
+
+from agents import SEOCrewAgents
+from tools.http_pool import get_session
+
+
+_agents = None
+_lock = threading.Lock()
+
+
+def get_crew_agents():
+    """
+    Process-wide SEOCrewAgents shared by every run and session.
+
+    It only holds the tools and LLM clients; the Agent objects themselves are
+    built fresh by its methods on every run, so no per-run state is shared.
+    """
+    global _agents
+    with _lock:
+        if _agents is None:
+            # Open the shared keep-alive pool up front so the first scrape doesn't pay for it
+            get_session()
+            _agents = SEOCrewAgents()
+        return _agents
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import re
+import threading
+import time
+
+import storage
+
+
+DEFAULT_PATH = storage.data_path("revisions.sqlite3")
+
+
+def text_fingerprint(text):
+    """Hash of a page's main text, ignoring whitespace-only differences."""
+    return hashlib.sha256(re.sub(r"\s+", " ", text).strip().encode("utf-8")).hexdigest()
+
+
+def _operator(operator_input):
+    return operator_input.strip().lower()
+
+
+class RevisionStore:
+    """
+    What the last publication of each review was built from: a fingerprint
+    of every source page and research fact, the published article per
+    market, its outline, and which facts each of its sections relied on.
+    A refresh compares against this to rewrite only what changed.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        with storage.open_db(path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sources ("
+                "operator TEXT NOT NULL, url TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+                "checked_at REAL NOT NULL, PRIMARY KEY (operator, url))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS facts ("
+                "operator TEXT NOT NULL, path TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+                "source_url TEXT, PRIMARY KEY (operator, path))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS publications ("
+                "operator TEXT NOT NULL, market TEXT NOT NULL, outline TEXT NOT NULL, "
+                "article TEXT NOT NULL, sections TEXT NOT NULL, published_at REAL NOT NULL, "
+                "PRIMARY KEY (operator, market))"
+            )
+
+    def _connect(self):
+        return storage.connect(self.path)
+
+    def sources(self, operator_input):
+        """{url: fingerprint} of the pages the last publication's facts came from."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url, fingerprint FROM sources WHERE operator = ?", (_operator(operator_input),)
+            ).fetchall()
+        return dict(rows)
+
+    def save_sources(self, operator_input, fingerprints):
+        """Replace the operator's source fingerprints; pages no longer cited are dropped."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM sources WHERE operator = ?", (_operator(operator_input),))
+            conn.executemany(
+                "INSERT OR REPLACE INTO sources (operator, url, fingerprint, checked_at) VALUES (?, ?, ?, ?)",
+                [(_operator(operator_input), url, value, now) for url, value in fingerprints.items()]
+            )
+
+    def changed_facts(self, operator_input, facts):
+        """Paths of facts that are new, gone, or hold a different value than last time."""
+        with self._lock, self._connect() as conn:
+            previous = dict(conn.execute(
+                "SELECT path, fingerprint FROM facts WHERE operator = ?", (_operator(operator_input),)
+            ).fetchall())
+        current = {fact.path: fact.fingerprint() for fact in facts}
+        return {path for path in previous.keys() | current.keys() if previous.get(path) != current.get(path)}
+
+    def save_facts(self, operator_input, facts):
+        operator = _operator(operator_input)
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM facts WHERE operator = ?", (operator,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO facts (operator, path, fingerprint, source_url) VALUES (?, ?, ?, ?)",
+                [(operator, fact.path, fact.fingerprint(), fact.source_url if isinstance(fact.source_url, str) else None)
+                 for fact in facts]
+            )
+
+    def publication(self, operator_input, market=None):
+        """The last published article for a market, with its outline and {heading: [fact paths]}."""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT outline, article, sections, published_at FROM publications "
+                "WHERE operator = ? AND market = ?",
+                (_operator(operator_input), market or "")
+            ).fetchone()
+        if row is None:
+            return None
+        outline, article, sections, published_at = row
+        return {
+            "outline": outline,
+            "article": article,
+            "sections": json.loads(sections),
+            "published_at": published_at,
+        }
+
+    def publish(self, operator_input, market, outline, article, sections):
+        """sections: {heading: [paths of the facts it relies on]}"""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO publications "
+                "(operator, market, outline, article, sections, published_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (_operator(operator_input), market or "", outline, article, json.dumps(sections), time.time())
+            )
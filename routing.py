@@ -0,0 +1,106 @@
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List, Optional
+
+import tracing
+
+
+# Cheapest first; later entries are the fallbacks. Override a tier with e.g.
+# MODEL_TIER_FAST="gpt-4.1-nano,gpt-4.1-mini"
+TIERS = {
+    "fast": ["gpt-4.1-nano", "gpt-4.1-mini", "gpt-4.1"],
+    "standard": ["gpt-4.1-mini", "gpt-4.1"],
+    "flagship": ["gpt-4.1", "gpt-4o"],
+}
+
+ENABLED = os.environ.get("MODEL_ROUTING", "1") != "0"
+
+_active = contextvars.ContextVar("route", default=None)
+
+
+@dataclass
+class Route:
+    """
+    Model choice for one stage.
+
+    tier: key of TIERS giving the preferred model and its fallback chain
+    latency_s: per-call budget; a model that hasn't answered by then is
+        abandoned for the next one in the chain (the last one always runs to
+        completion)
+    max_cost_usd: per-call budget; models whose estimated cost exceeds it
+        are skipped
+    fallbacks: explicit chain replacing the tier's
+    """
+    tier: str
+    latency_s: Optional[float] = None
+    max_cost_usd: Optional[float] = None
+    fallbacks: Optional[List[str]] = None
+    # Completion size assumed when estimating a call's cost up front
+    expected_tokens: int = 1500
+
+    def models(self):
+        if self.fallbacks:
+            return list(self.fallbacks)
+        override = os.environ.get(f"MODEL_TIER_{self.tier.upper()}")
+        if override:
+            return [model.strip() for model in override.split(",") if model.strip()]
+        return list(TIERS[self.tier])
+
+    def candidates(self, prompt_tokens):
+        chain = self.models()
+        if self.max_cost_usd is None:
+            return chain
+        affordable = [
+            model for model in chain
+            if tracing.estimate_cost(model, prompt_tokens, self.expected_tokens) <= self.max_cost_usd
+        ]
+        # Nothing fits: the cheapest model is the closest we can get
+        return affordable or [min(chain, key=lambda model: tracing.estimate_cost(model, 1, 1))]
+
+
+@contextmanager
+def use(stage, route, log=None):
+    """Route every ReviewLLM call made in this context (and threads copied from it)."""
+    if route is None or not ENABLED:
+        yield
+        return
+    token = _active.set((stage, route, log or print))
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+def active():
+    return _active.get()
+
+
+def call(llm, messages, tools=None, *args, **kwargs):
+    """Run one completion through the active route's chain, falling back on errors and timeouts."""
+    stage, route, log = _active.get()
+    chain = route.candidates(tracing.estimate_tokens(messages))
+
+    for attempt, model in enumerate(chain):
+        last = attempt == len(chain) - 1
+        variant = llm.variant(model, timeout=None if last else route.latency_s)
+        started = time.perf_counter()
+        try:
+            response = variant.call(messages, tools, *args, **kwargs)
+        except Exception as e:
+            if last:
+                raise
+            log(
+                f"↪️ {stage}: {model} failed after {time.perf_counter() - started:.1f}s "
+                f"({type(e).__name__}), falling back to {chain[attempt + 1]}"
+            )
+            continue
+
+        elapsed = time.perf_counter() - started
+        note = " (fallback)" if attempt else ""
+        if route.latency_s and elapsed > route.latency_s:
+            note += f" over {route.latency_s:.0f}s budget"
+        log(f"🧭 {stage}: {model} [{route.tier}] {elapsed:.1f}s{note}")
+        return response
@@ -0,0 +1,94 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class TaskGraphScheduler:
+    """
+    Runs a dependency graph of named stages, starting each stage as soon as
+    every stage it depends on has finished.
+
+    graph:   {name: [names it depends on]}, in declaration order
+    execute: callable(name, upstream) -> output, where `upstream` maps each
+             dependency name to its output
+    """
+
+    def __init__(self, graph, execute, workers=2, log=None):
+        self.graph = graph
+        self.execute = execute
+        self.workers = max(1, workers)
+        self.log = log or (lambda x: None)
+        self.timings = {}
+        self._validate()
+
+    def _validate(self):
+        for name, deps in self.graph.items():
+            for dep in deps:
+                if dep not in self.graph:
+                    raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self.order()
+
+    def order(self):
+        """Topological order, stable with respect to declaration order."""
+        remaining = {name: set(deps) for name, deps in self.graph.items()}
+        ordered = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Dependency cycle between stages: {sorted(remaining)}")
+            for name in ready:
+                ordered.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return ordered
+
+    def descendants(self, name):
+        """`name` plus every stage that transitively depends on it."""
+        if name not in self.graph:
+            raise ValueError(f"Unknown stage '{name}'")
+        found = {name}
+        for stage in self.order():
+            if any(dep in found for dep in self.graph[stage]):
+                found.add(stage)
+        return found
+
+    def _run_stage(self, name, upstream):
+        started = time.perf_counter()
+        output = self.execute(name, upstream)
+        self.timings[name] = time.perf_counter() - started
+        return output
+
+    def run(self):
+        outputs = {}
+        pending = dict(self.graph)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending or running:
+                for name, deps in list(pending.items()):
+                    if len(running) >= self.workers:
+                        break
+                    if all(dep in outputs for dep in deps):
+                        del pending[name]
+                        upstream = {dep: outputs[dep] for dep in deps}
+                        self.log(f"▶️ Starting {name}")
+                        # Copy the context so tracing follows the stage onto the worker thread
+                        future = executor.submit(
+                            contextvars.copy_context().run, self._run_stage, name, upstream
+                        )
+                        running[future] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        outputs[name] = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        self.log(f"❌ {name} failed")
+                        raise
+                    self.log(f"✔️ Finished {name} in {self.timings[name]:.1f}s")
+
+        return outputs
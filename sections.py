@@ -0,0 +1,129 @@
+import re
+
+
+HEADING = re.compile(r"^\s*(#{1,6})\s+(.+?)\s*#*\s*$")
+NUMBERED = re.compile(r"^(?:\d+[.)]|[IVX]+\.)\s+(.+?)\s*$")
+BOLD = re.compile(r"^\*\*(.+?)\*\*:?\s*$")
+
+
+def _clean_heading(text):
+    # "H2: Bonuses", "H1 Title: GGPoker Review 2026", "Title - ..." -> the heading text itself
+    text = text.strip().strip("*_ ")
+    text = re.sub(r"^(?:H[1-6](?:\s+title)?|title)\s*[:\-–]\s*", "", text, flags=re.IGNORECASE)
+    return text.strip("*_ :").strip()
+
+
+def _is_title(heading):
+    lowered = heading.lower()
+    return lowered.startswith("h1") or lowered in ("title", "h1 title")
+
+
+def split_outline(outline):
+    """
+    Split a Markdown outline into (title, [(heading, section_outline), ...])
+    in outline order. Sections are the H2 headings, or the H1s when the
+    outline has no H2s, else its bold lines, else its numbered lines (numbered
+    lines under bold headings are that section's points, not sections).
+    """
+    lines = outline.splitlines()
+    headings = [(i, HEADING.match(line)) for i, line in enumerate(lines)]
+    levels = [len(m.group(1)) for _, m in headings if m]
+
+    if levels.count(2) >= 2:
+        level = 2
+    elif levels.count(1) >= 2:
+        level = 1
+    else:
+        level = None
+
+    if level:
+        starts = {i: m.group(2) for i, m in headings if m and len(m.group(1)) == level}
+    else:
+        starts = {i: m.group(1) for i, m in ((i, BOLD.match(line)) for i, line in enumerate(lines)) if m}
+        if not starts:
+            starts = {i: m.group(1) for i, m in ((i, NUMBERED.match(line)) for i, line in enumerate(lines)) if m}
+
+    title = None
+    if level != 1:
+        title = next((_clean_heading(m.group(2)) for _, m in headings if m and len(m.group(1)) == 1), None)
+
+    sections = []
+    indexes = sorted(starts)
+    for n, start in enumerate(indexes):
+        end = indexes[n + 1] if n + 1 < len(indexes) else len(lines)
+        raw = starts[start].strip().strip("*_ ")
+        heading = _clean_heading(raw)
+        body = "\n".join(lines[start + 1:end]).strip()
+        if _is_title(raw):
+            # "H1 Title" blocks name the article rather than a section to write
+            inline = heading if ":" in raw else ""
+            first = next((line for line in body.splitlines() if line.strip()), "")
+            title = title or inline or first.strip("-*•\"' ") or None
+            continue
+        sections.append((heading, body))
+
+    return title, sections
+
+
+def replace_sections(article, replacements):
+    """
+    `article` with the body of each section named in `replacements`
+    ({heading: new text}) swapped for the new text. The title, the other
+    sections and anything outside them are left exactly as they were.
+    """
+    wanted = {heading.lower(): text for heading, text in replacements.items()}
+    out = []
+    skip_level = None
+    for line in article.splitlines():
+        match = HEADING.match(line)
+        if match and skip_level is not None and len(match.group(1)) <= skip_level:
+            skip_level = None
+        if skip_level is not None:
+            continue
+        out.append(line)
+        if match and len(match.group(1)) <= 2:
+            heading = _clean_heading(match.group(2))
+            if heading.lower() in wanted:
+                body = wanted[heading.lower()].strip()
+                first = HEADING.match(body.splitlines()[0]) if body else None
+                if first and _clean_heading(first.group(2)).lower() == heading.lower():
+                    body = "\n".join(body.splitlines()[1:]).strip()
+                out += ["", re.sub(r"^# ", "### ", body, flags=re.MULTILINE), ""]
+                skip_level = len(match.group(1))
+    return "\n".join(out).rstrip() + "\n"
+
+
+def _normalize(paragraph):
+    return re.sub(r"\W+", " ", paragraph).strip().lower()
+
+
+def merge_sections(title, parts):
+    """
+    Merge independently written sections in outline order with a light
+    consistency pass: one H1, exactly one `## heading` per section, stray H1s
+    demoted, and long paragraphs repeated across sections dropped.
+    """
+    seen = set()
+    merged = [f"# {title}"] if title else []
+
+    for heading, text in parts:
+        paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text.strip()) if p.strip()]
+
+        first = HEADING.match(paragraphs[0].splitlines()[0]) if paragraphs else None
+        if first and _clean_heading(first.group(2)).lower() == heading.lower():
+            paragraphs[0] = "\n".join(paragraphs[0].splitlines()[1:]).strip()
+
+        body = [f"## {heading}"]
+        for paragraph in paragraphs:
+            if not paragraph:
+                continue
+            paragraph = re.sub(r"^# ", "### ", paragraph, flags=re.MULTILINE)
+            key = _normalize(paragraph)
+            if len(key) > 80:
+                if key in seen:
+                    continue
+                seen.add(key)
+            body.append(paragraph)
+        merged.append("\n\n".join(body))
+
+    return "\n\n".join(merged) + "\n"
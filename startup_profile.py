@@ -0,0 +1,104 @@
+"""
+Startup profile for the Streamlit app.
+
+    python startup_profile.py                  # per-module import cost
+    python startup_profile.py --budget-ms 1500 # also fail when over budget
+
+Replays the module-level imports of streamlit_app.py in a fresh interpreter
+under `python -X importtime`, reports the most expensive modules, and fails
+(exit 1) when the total exceeds the budget or when any of the heavy review
+dependencies is pulled in before the first render.
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py")
+DEFAULT_BUDGET_MS = int(os.environ.get("STARTUP_BUDGET_MS", 1000))
+
+# Only needed once a review starts; importing any of them at startup is a regression
+HEAVY_MODULES = ["crewai", "langchain", "langchain_core", "langchain_openai", "litellm", "bs4", "requests"]
+
+
+def startup_imports(path=APP_PATH):
+    """Module-level import statements of the app, as source lines."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def profile(statements):
+    """
+    Run `statements` under -X importtime. Returns ({module: (self_us,
+    cumulative_us)}, total_us, top-level modules loaded).
+    """
+    # Written straight to fd 1: some libraries swap sys.stdout while importing
+    probe = "\n".join(statements + [
+        "import os, sys",
+        "os.write(1, ','.join(sorted({name.split('.')[0] for name in sys.modules})).encode())",
+    ])
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(APP_PATH),
+        check=True
+    )
+
+    timings = {}
+    total_us = 0
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+        # Nested imports are indented further; top-level entries add up to the total
+        if len(name) - len(name.lstrip()) == 1:
+            total_us += int(cumulative_us)
+
+    lines = completed.stdout.strip().splitlines()
+    loaded = set(lines[-1].split(",")) if lines else set()
+    return timings, total_us, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile streamlit_app.py import cost.")
+    parser.add_argument("--top", type=int, default=20, help="Modules to list")
+    parser.add_argument("--budget-ms", type=int, default=DEFAULT_BUDGET_MS, help="Total import budget")
+    args = parser.parse_args(argv)
+
+    statements = startup_imports()
+    timings, total_us, loaded = profile(statements)
+
+    print("⏱️ Startup imports of streamlit_app.py:")
+    for statement in statements:
+        print(f"   {statement}")
+
+    print(f"\n{'module':<50} {'self ms':>10} {'cumul. ms':>10}")
+    ranked = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_us, cumulative_us) in ranked[:args.top]:
+        print(f"{name:<50} {self_us / 1000:>10.1f} {cumulative_us / 1000:>10.1f}")
+
+    total_ms = total_us / 1000
+    print(f"\nTotal import time before first render: {total_ms:.0f} ms (budget {args.budget_ms} ms)")
+
+    failed = False
+    eager = sorted(module for module in HEAVY_MODULES if module in loaded)
+    if eager:
+        print(f"❌ Heavy modules imported at startup: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"❌ Startup import time over budget by {total_ms - args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("✅ Startup within budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
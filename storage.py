@@ -0,0 +1,28 @@
+import os
+import sqlite3
+
+
+# Every cache, index, checkpoint and queue file defaults to this directory.
+# Resolved once, so worker processes started from another cwd share it.
+DATA_DIR = os.path.abspath(os.environ.get("SCRAPE_CACHE_DIR", ".cache"))
+
+
+def data_path(name):
+    return os.path.join(DATA_DIR, name)
+
+
+def connect(path):
+    # Workers in other processes write to the same files; wait for them instead of failing
+    return sqlite3.connect(path, timeout=30)
+
+
+def open_db(path):
+    """
+    First connection to a store's file: creates its directory and switches
+    it to WAL, so readers in one process don't block a writer in another.
+    Use it for the schema; later calls go through `connect`.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
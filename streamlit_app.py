@@ -1,9 +1,16 @@
 import os
+import time
+from collections import deque
 import streamlit as st
-from main import PokerReviewCrew
 from dotenv import load_dotenv
 import json
 
+from compliance_scan import available_packs
+from jobs import JobQueue, start_workers
+
+# crewai, LangChain, bs4 and requests are only imported by the review workers
+# (see jobs.py and startup_profile.py), so the page renders without paying for them
+
 # Load environment variables
 load_dotenv()
 
@@ -20,6 +27,26 @@ st.set_page_config(
     layout="wide"
 )
 
+
+POLL_SECONDS = 2
+# Lines kept on screen (and in session memory); the full log stays in the job queue
+LOG_TAIL_LINES = 200
+LIVE_OUTPUT_CHARS = 4000
+
+
+@st.cache_resource
+def job_queue():
+    # Reviews run in worker processes; the app only submits and polls
+    queue = JobQueue()
+    workers = int(os.environ.get("JOB_WORKERS", 2))
+    if workers and not queue.stats()["workers"]:
+        start_workers(workers, queue.path)
+    return queue
+
+
+queue = job_queue()
+
+
 # ---------------- SIDEBAR ----------------
 with st.sidebar:
     st.header("🤖 Poker Review Agent Team")
@@ -47,6 +74,18 @@ Ensures regulatory safety.
 Prepares publication-ready output.
 """)
 
+    st.header("📬 Review Queue")
+    stats = queue.stats()
+    col1, col2 = st.columns(2)
+    col1.metric("Queued", stats["queued"])
+    col2.metric("Running", stats["running"])
+    col1.metric("Avg wait", f"{stats['avg_wait_seconds']:.0f}s")
+    col2.metric("Workers busy", f"{stats['busy_workers']}/{stats['workers']}")
+    st.caption(
+        f"Worker utilization {stats['utilization']:.0%} · "
+        f"oldest queued job waiting {stats['oldest_wait_seconds']:.0f}s"
+    )
+
 # ---------------- MAIN ----------------
 st.title("♠️ Poker Operator Review Automation")
 
@@ -60,121 +99,176 @@ operator_input = st.text_input(
     placeholder="e.g. GGPoker or https://ggpoker.com"
 )
 
-if st.button("Generate Review"):
+markets = st.multiselect(
+    "Markets:",
+    available_packs(),
+    help="One edition per market. Research and writing are shared; compliance and editorial run per market."
+)
 
+if st.button("Generate Review"):
     if not operator_input:
         st.error("Please enter an operator name or URL.")
     else:
-        st.subheader("🚀 Running Poker Review Crew...")
+        # The job id lives in the URL, so a reload picks the run back up
+        options = {"jurisdictions": markets} if markets else {}
+        st.query_params["job"] = queue.submit(operator_input.strip(), **options)
+
+
+def show_result(operator_input, result, logs):
+    editions = result.get("markets")
+    if editions:
+        market = st.radio("Market edition:", list(editions), horizontal=True)
+        result = editions[market]
+        operator_input = f"{operator_input}_{market}"
+
+    review_content = result.get("final_review", "")
+    meta_data = result.get("meta", {})
+    compliance_flags = result.get("compliance_flags", [])
+    editor_summary = result.get("editor_summary", "")
+    resumed_stages = result.get("resumed_stages", {})
+
+    if resumed_stages:
+        # Checkpointed stages weren't rerun; their output is as old as the checkpoint
+        st.info("⏭️ Reused from earlier runs: " + ", ".join(
+            f"{stage} ({(time.time() - saved_at) / 3600:.1f}h old)" for stage, saved_at in resumed_stages.items()
+        ))
+
+    # ---------------- TABS ----------------
+
+    tab1, tab2, tab3, tab4 = st.tabs(
+        ["📄 Review", "🚀 SEO Metadata", "⚖️ Compliance", "📜 Logs"]
+    )
+
+    # ---- TAB 1: REVIEW ----
+    with tab1:
+        if review_content:
+            st.markdown(review_content)
+
+            st.download_button(
+                label="⬇️ Download Markdown",
+                data=str(review_content),
+                file_name=f"{operator_input}_review.md",
+                mime="text/markdown"
+            )
+
+            html_content = f"<html><body>{review_content}</body></html>"
+
+            st.download_button(
+                label="⬇️ Download HTML",
+                data=html_content.encode("utf-8"),
+                file_name=f"{operator_input}_review.html",
+                mime="text/html"
+            )
+        else:
+            st.warning("No review content returned.")
+
 
-        log_area = st.empty()
-        logs = []
+    # ---- TAB 2: SEO METADATA ----
+    with tab2:
+        if meta_data:
+            st.json(meta_data)
 
-        def stream_log(log_line):
-            logs.append(log_line)
-            log_area.markdown("```\n" + "\n".join(logs) + "\n```")
+            st.download_button(
+                label="⬇️ Download SEO Metadata (JSON)",
+                data=json.dumps(meta_data, indent=2),
+                file_name=f"{operator_input}_seo_metadata.json",
+                mime="application/json"
+            )
+        else:
+            st.info("No structured SEO metadata returned.")
+
+
+    # ---- TAB 3: COMPLIANCE ----
+    with tab3:
+        if compliance_flags:
+            st.warning("⚠️ Compliance Flags Found:")
+            for flag in compliance_flags:
+                st.write(f"- {flag}")
+
+            st.download_button(
+                label="⬇️ Download Compliance Report",
+                data=json.dumps(compliance_flags, indent=2),
+                file_name=f"{operator_input}_compliance.json",
+                mime="application/json"
+            )
+        else:
+            st.success("✅ No compliance issues detected.")
+
+        if editor_summary:
+            st.subheader("🧑‍⚖️ Editorial Summary")
+            st.write(editor_summary)
+
+
+    # ---- TAB 4: LOGS ----
+    with tab4:
+        stage_summary = result.get("stage_summary")
+        if stage_summary:
+            st.subheader("⏱️ Stage Timings & Cost")
+            st.table(stage_summary)
+            st.caption("Token counts and costs are estimates (~4 characters per token).")
+
+        if logs:
+            log_text = "\n".join(logs)
+            st.code("\n".join(logs[-LOG_TAIL_LINES:]), language=None)
+            if len(logs) > LOG_TAIL_LINES:
+                st.caption(f"Showing the last {LOG_TAIL_LINES} of {len(logs)} lines; the download has all of them.")
+
+            st.download_button(
+                label="⬇️ Download Logs",
+                data=log_text,
+                file_name=f"{operator_input}_logs.txt",
+                mime="text/plain"
+            )
+        else:
+            st.info("No logs available.")
 
-        poker_crew = PokerReviewCrew(
-            operator_input,
-            log_callback=stream_log
-        )
+    st.success("✅ Review generation completed. Manual verification required before publication.")
 
-        with st.spinner("Agents are working..."):
-            result = poker_crew.run()
 
-        # ---------------- STRUCTURED HANDLING ----------------
+@st.fragment(run_every=POLL_SECONDS)
+def live_job(job_id):
+    # Only this block reruns while the review is in progress
+    job = queue.get(job_id)
+    if job["status"] in ("done", "failed"):
+        st.rerun()
 
-        if isinstance(result, dict):
-            review_content = result.get("final_review", "")
-            meta_data = result.get("meta", {})
-            compliance_flags = result.get("compliance_flags", [])
-            editor_summary = result.get("editor_summary", "")
-        else:
-            # Fallback if raw text returned
-            review_content = result
-            meta_data = {}
-            compliance_flags = []
-            editor_summary = ""
-
-        # ---------------- TABS ----------------
-
-        tab1, tab2, tab3, tab4 = st.tabs(
-            ["📄 Review", "🚀 SEO Metadata", "⚖️ Compliance", "📜 Logs"]
-        )
-
-        # ---- TAB 1: REVIEW ----
-        with tab1:
-            if review_content:
-                st.markdown(review_content)
-
-                st.download_button(
-                    label="⬇️ Download Markdown",
-                    data=str(review_content),
-                    file_name=f"{operator_input}_review.md",
-                    mime="text/markdown"
-                )
-
-                html_content = f"<html><body>{review_content}</body></html>"
-
-                st.download_button(
-                    label="⬇️ Download HTML",
-                    data=html_content.encode("utf-8"),
-                    file_name=f"{operator_input}_review.html",
-                    mime="text/html"
-                )
-            else:
-                st.warning("No review content returned.")
-
-
-        # ---- TAB 2: SEO METADATA ----
-        with tab2:
-            if meta_data:
-                st.json(meta_data)
-
-                st.download_button(
-                    label="⬇️ Download SEO Metadata (JSON)",
-                    data=json.dumps(meta_data, indent=2),
-                    file_name=f"{operator_input}_seo_metadata.json",
-                    mime="application/json"
-                )
-            else:
-                st.info("No structured SEO metadata returned.")
-
-
-        # ---- TAB 3: COMPLIANCE ----
-        with tab3:
-            if compliance_flags:
-                st.warning("⚠️ Compliance Flags Found:")
-                for flag in compliance_flags:
-                    st.write(f"- {flag}")
-
-                st.download_button(
-                    label="⬇️ Download Compliance Report",
-                    data=json.dumps(compliance_flags, indent=2),
-                    file_name=f"{operator_input}_compliance.json",
-                    mime="application/json"
-                )
-            else:
-                st.success("✅ No compliance issues detected.")
-
-            if editor_summary:
-                st.subheader("🧑‍⚖️ Editorial Summary")
-                st.write(editor_summary)
-
-
-        # ---- TAB 4: LOGS ----
-        with tab4:
-            if logs:
-                log_text = "\n".join(logs)
-                st.markdown(f"```\n{log_text}\n```")
-
-                st.download_button(
-                    label="⬇️ Download Logs",
-                    data=log_text,
-                    file_name=f"{operator_input}_logs.txt",
-                    mime="text/plain"
-                )
-            else:
-                st.info("No logs available.")
-
-        st.success("✅ Review generation completed. Manual verification required before publication.")
+    if job["status"] == "queued":
+        st.subheader(f"⏳ Queued: {job['operator']}")
+        st.info(f"{job['position']} job(s) ahead · waiting {time.time() - job['submitted_at']:.0f}s")
+    else:
+        st.subheader(f"🚀 Running Poker Review Crew for {job['operator']}...")
+        st.caption(f"Running for {time.time() - job['started_at']:.0f}s")
+
+    # Fetch only the lines logged since the last poll into a bounded tail
+    state = st.session_state.setdefault(
+        f"live-{job_id}",
+        {"seq": 0, "tail": deque(maxlen=LOG_TAIL_LINES)}
+    )
+    for seq, line in queue.logs(job_id, after=state["seq"]):
+        state["tail"].append(line)
+        state["seq"] = seq
+
+    live = queue.live_output(job_id, LIVE_OUTPUT_CHARS)
+    if live:
+        stage, text = live
+        st.markdown(f"**✍️ Live output: {stage}**")
+        st.text(text)
+
+    if state["tail"]:
+        st.code("\n".join(state["tail"]), language=None)
+
+
+job_id = st.query_params.get("job")
+job = queue.get(job_id) if job_id else None
+
+if job_id and job is None:
+    st.warning("That review job no longer exists.")
+elif job and job["status"] == "done":
+    show_result(job["operator"], job["result"], [line for _, line in queue.logs(job["id"])])
+elif job and job["status"] == "failed":
+    st.error(f"❌ Review of {job['operator']} failed: {job['error']}")
+    logs = [line for _, line in queue.logs(job["id"])]
+    if logs:
+        st.code("\n".join(logs[-LOG_TAIL_LINES:]), language=None)
+elif job:
+    live_job(job["id"])
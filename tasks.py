@@ -1,12 +1,48 @@
 from crewai import Task
 
+from routing import Route
+
+
+def market_stage(name, market=None):
+    """Name of one market's fork of a stage, e.g. 'compliance_review_task@uk'."""
+    return f"{name}@{market}" if market else name
+
+
+def stage_market(name):
+    """'compliance_review_task@uk' -> ('compliance_review_task', 'uk'); unforked stages have no market."""
+    base, _, market = name.partition("@")
+    return base, market or None
+
+
+def market_label(market):
+    return market.upper() if len(market) <= 3 else market.title()
+
 
 class SEOCrewTasks:
+    def __init__(self):
+        # Stage name -> names of the stages whose output it consumes
+        self.depends_on = {}
+        # Stage name -> slice of upstream context it is given, e.g.
+        # {"facts": {"topics": [...], "detail": False}, "serp": "keywords"}
+        self.inputs = {}
+        # Stage name -> Route: model tier, latency/cost budget and fallbacks.
+        # Structural stages run on the cheap tiers; the flagship is kept for
+        # the prose and compliance work.
+        self.routes = {}
+
+    def _task(self, name, depends_on=(), inputs=None, route=None, **kwargs):
+        task = Task(name=name, **kwargs)
+        self.depends_on[name] = [dep.name for dep in depends_on]
+        self.inputs[name] = inputs or {}
+        self.routes[name] = route
+        return task
 
     # 1️⃣ OPERATOR RESEARCH
     def operator_research_task(self, agent, operator_input):
-        return Task(
+        return self._task(
+            "operator_research_task",
             agent=agent,
+            route=Route("standard", latency_s=60, max_cost_usd=0.05),
             description=(
                 f"Research the poker operator '{operator_input}'. "
                 "Current year is {self.current_year}"
@@ -18,7 +54,8 @@ class SEOCrewTasks:
                 "- Deposit and withdrawal methods\n"
                 "- Licensing and regulatory status\n"
                 "- Reputation indicators\n\n"
-                "Use search and scraping tools where necessary. "
+                "Start with knowledge_search for what earlier reviews of this room and its network already "
+                "verified, and use search and scraping tools only for what is missing, stale or conflicting. "
                 "Output structured factual data only, not prose."
             ),
             expected_output=(
@@ -31,10 +68,11 @@ class SEOCrewTasks:
         )
 
     # 2️⃣ SERP INTELLIGENCE
-    def serp_analysis_task(self, agent, operator_input, research_task):
-        return Task(
+    def serp_analysis_task(self, agent, operator_input):
+        return self._task(
+            "serp_analysis_task",
             agent=agent,
-            depends_on=[research_task],
+            route=Route("fast", latency_s=30, max_cost_usd=0.01),
             description=(
                 f"Analyze search engine results for '{operator_input} review', "
                 f"'{operator_input} rakeback', and related keywords.\n\n"
@@ -57,8 +95,11 @@ class SEOCrewTasks:
 
     # 3️⃣ REVIEW ARCHITECTURE
     def review_outline_task(self, agent, operator_input, research_task, serp_task):
-        return Task(
+        return self._task(
+            "review_outline_task",
             agent=agent,
+            route=Route("standard", latency_s=45, max_cost_usd=0.03),
+            inputs={"facts": {"detail": False}},
             depends_on=[research_task, serp_task],
             description=(
                 f"Create a structured outline for a full poker operator review for '{operator_input}'.\n\n"
@@ -88,8 +129,11 @@ class SEOCrewTasks:
 
     # 4️⃣ REVIEW WRITING
     def review_writing_task(self, agent, operator_input, research_task, outline_task):
-        return Task(
+        return self._task(
+            "review_writing_task",
             agent=agent,
+            route=Route("flagship", latency_s=120),
+            inputs={"facts": {}},
             depends_on=[research_task, outline_task],
             description=(
                 f"Write a complete poker operator review for '{operator_input}' following the approved outline.\n\n"
@@ -110,10 +154,35 @@ class SEOCrewTasks:
             config={}
         )
 
-    # 5️⃣ SEO OPTIMIZATION
-    def seo_optimization_task(self, agent, operator_input, writing_task, serp_task):
+    # 4️⃣b SECTION WRITING (one per outline section, run concurrently)
+    def review_section_task(self, agent, operator_input, heading, section_outline, audience_tone):
         return Task(
+            name=f"review_writing_task: {heading}",
             agent=agent,
+            description=(
+                f"Write only the '{heading}' section of the poker operator review for '{operator_input}'. "
+                "Other sections are being written in parallel from the same outline and research, so do not "
+                "add an introduction, conclusion or content that belongs to other sections.\n\n"
+                f"Section outline:\n{section_outline or '- (no bullets given; follow the full outline)'}\n\n"
+                "Use only verified data from the research phase. Do not invent specific numerical offers or "
+                "guarantees. If data varies by region or source, explain that clearly.\n\n"
+                f"{audience_tone}\n\n"
+                f"Start with the heading '## {heading}' and use ### for any sub-headings."
+            ),
+            expected_output=(
+                f"The '{heading}' section in Markdown, starting with '## {heading}', written for intermediate "
+                "to advanced online poker players."
+            ),
+            config={}
+        )
+
+    # 5️⃣ SEO OPTIMIZATION
+    def seo_optimization_task(self, agent, operator_input, writing_task, serp_task, market=None):
+        return self._task(
+            market_stage("seo_optimization_task", market),
+            agent=agent,
+            route=Route("standard", latency_s=60, max_cost_usd=0.05),
+            inputs={"serp": "keywords"},
             depends_on=[writing_task, serp_task],
             description=(
                 f"Optimize the '{operator_input}' review for search engines.\n\n"
@@ -127,6 +196,8 @@ class SEOCrewTasks:
                 "average rakeback compared to competitors, limited high-stakes action). Optimize headings, internal "
                 "anchors, and keyword placement, but keep the poker-player voice intact.\n\n"
                 "Preserve readability and natural tone."
+                + (f"\n\nLocalize for the {market_label(market)} market: use the keyword variants, spelling, "
+                   "currency and payment methods searchers there use." if market else "")
             ),
             expected_output=(
                 "SEO-optimized review content including meta title, meta description, FAQ schema suggestions, "
@@ -136,9 +207,12 @@ class SEOCrewTasks:
         )
 
     # 6️⃣ COMPLIANCE & RISK REVIEW
-    def compliance_review_task(self, agent, operator_input, seo_task):
-        return Task(
+    def compliance_review_task(self, agent, operator_input, seo_task, market=None):
+        return self._task(
+            market_stage("compliance_review_task", market),
             agent=agent,
+            route=Route("flagship", latency_s=90),
+            inputs={"facts": {"topics": ["bonus", "rakeback", "licensing"]}},
             depends_on=[seo_task],
             description=(
                 f"Review the '{operator_input}' review for compliance risks.\n\n"
@@ -150,6 +224,8 @@ class SEOCrewTasks:
                 "- Bonus clarity issues\n\n"
                 "Add necessary disclaimers where required. Preserve honest discussion of drawbacks (e.g., traffic, "
                 "rakeback, software issues). Do not remove balanced criticism unless it creates legal risk."
+                + (f"\n\nThis edition is published in the {market_label(market)} market; apply its advertising "
+                   "and gambling rules." if market else "")
             ),
             expected_output=(
                 "Compliance-reviewed version of the article with risk flags identified and corrections applied, "
@@ -158,10 +234,31 @@ class SEOCrewTasks:
             config={}
         )
 
-    # 7️⃣ FINAL EDITORIAL PACKAGING
-    def editorial_packaging_task(self, agent, operator_input, compliance_task):
+    # 6️⃣b COMPLIANCE ON FLAGGED SPANS (after the local rule scan)
+    def compliance_spans_task(self, agent, operator_input, flagged):
         return Task(
+            name="compliance_review_task: flagged spans",
+            agent=agent,
+            description=(
+                f"A rule-based scan of the '{operator_input}' review flagged the paragraphs below for compliance "
+                "risks (misleading or guaranteed-profit claims, bonus clarity, hype phrases).\n\n"
+                f"{flagged}\n\n"
+                "Rewrite each flagged paragraph so it is jurisdictionally safe and non-misleading. Keep the facts, "
+                "the poker-native tone and any honest criticism; only change what creates risk."
+            ),
+            expected_output=(
+                "Every flagged paragraph, each starting with its original marker on its own line (e.g. [[P3]]) "
+                "followed by the corrected paragraph text only. No other commentary."
+            ),
+            config={}
+        )
+
+    # 7️⃣ FINAL EDITORIAL PACKAGING
+    def editorial_packaging_task(self, agent, operator_input, compliance_task, market=None):
+        return self._task(
+            market_stage("editorial_packaging_task", market),
             agent=agent,
+            route=Route("standard", latency_s=60, max_cost_usd=0.05),
             depends_on=[compliance_task],
             description=(
                 f"Prepare the final publication-ready version of the '{operator_input}' poker review.\n\n"
@@ -177,6 +274,8 @@ class SEOCrewTasks:
                 "- Is the tone consistent with a knowledgeable poker player speaking to another player?\n"
                 "- Are any phrases too generic or promotional for a reg audience? If so, rewrite them.\n\n"
                 "This is the final output before human approval."
+                + (f" This edition is for the {market_label(market)} market; keep its required disclaimers."
+                   if market else "")
             ),
             expected_output=(
                 "Publication-ready review article with editorial summary and review checklist, preserving a "
@@ -0,0 +1,23 @@
+import sqlite3
+
+from checkpoints import CheckpointStore
+
+
+def test_checkpoints_older_than_max_age_are_not_reused(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"), max_age=3600)
+    store.save("fresh", "GGPoker", "operator_research_task", "new facts")
+    store.save("stale", "GGPoker", "operator_research_task", "old facts")
+    with sqlite3.connect(store.path) as conn:
+        conn.execute("UPDATE checkpoints SET created_at = created_at - 7200 WHERE key = 'stale'")
+
+    assert store.load("fresh")[0] == "new facts"
+    assert store.load("stale") is None
+
+
+def test_max_age_zero_keeps_every_checkpoint(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"), max_age=0)
+    store.save("old", "GGPoker", "operator_research_task", "old facts")
+    with sqlite3.connect(store.path) as conn:
+        conn.execute("UPDATE checkpoints SET created_at = 0")
+
+    assert store.load("old")[0] == "old facts"
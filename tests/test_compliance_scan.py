@@ -0,0 +1,18 @@
+from compliance_scan import scan
+
+
+def test_required_rules_sharing_a_phrase_are_all_satisfied():
+    article = "GGPoker review.\n\n18+ only. Please play responsibly. Support: BeGambleAware.org"
+    result = scan(article, "uk")
+    assert not result.missing_disclaimers
+
+
+def test_missing_required_rule_is_still_flagged():
+    result = scan("GGPoker review with no signposting at all.", "uk")
+    assert {flag.rule for flag in result.missing_disclaimers} >= {"responsible_gambling_disclaimer", "uk_gambleaware"}
+
+
+def test_prohibited_phrases_are_flagged_per_paragraph():
+    result = scan("Intro.\n\nThis is a guaranteed profit for regs. 18+, play responsibly.")
+    assert [flag.rule for flag in result.flags] == ["guaranteed_profit"]
+    assert result.flagged_paragraphs == [1]
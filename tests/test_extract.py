@@ -0,0 +1,35 @@
+from tools.extract import extract_main_text
+
+
+REVIEW = "<p>" + "GGPoker pays 60% rakeback to high-volume regs through Fish Buffet. " * 3 + "</p>"
+
+
+def test_page_wrapped_in_a_form_keeps_its_text():
+    html = f'<html><body><form id="aspnetForm"><div>{REVIEW}</div><button>Go</button></form></body></html>'
+    assert "60% rakeback" in extract_main_text(html)
+
+
+def test_class_and_id_hints_match_whole_names_only():
+    for wrapper in ('<div class="container has-sidebar">', '<div id="main-menu-offset">'):
+        html = f"<html><body>{wrapper}{REVIEW}</div></body></html>"
+        assert "60% rakeback" in extract_main_text(html)
+
+
+def test_boilerplate_wrapping_main_content_is_kept():
+    html = f'<html><body><div class="sidebar"><main>{REVIEW}</main></div></body></html>'
+    assert "60% rakeback" in extract_main_text(html)
+
+
+def test_boilerplate_is_still_removed():
+    html = (
+        f'<html><body><div class="menu">Home Promotions Cashier</div>'
+        f'<div id="cookie-banner">Accept cookies</div>{REVIEW}</body></html>'
+    )
+    text = extract_main_text(html)
+    assert "60% rakeback" in text
+    assert "Cashier" not in text and "Accept cookies" not in text
+
+
+def test_falls_back_to_full_text_when_rules_remove_everything():
+    html = f'<html><body><div class="footer">{REVIEW}</div></body></html>'
+    assert "60% rakeback" in extract_main_text(html)
@@ -0,0 +1,23 @@
+from facts import FactStore
+
+
+def test_list_and_non_string_sources_are_normalized():
+    store = FactStore.from_output(
+        '{"bonus": {"value": "$600", "source_url": ["https://a.com", "https://b.com"], "confidence": ["high"]},'
+        ' "rakeback": {"value": "27%", "source_url": 42, "confidence": 0.9}}'
+    )
+    bonus, rakeback = store.facts
+    assert (bonus.source_url, bonus.confidence) == ("https://a.com", "high")
+    assert (rakeback.source_url, rakeback.confidence) == (None, None)
+
+
+def test_topic_follows_the_top_level_group():
+    store = FactStore.from_output(
+        '{"banking": {"cashout_time": {"value": "24h"}}, "reputation": {"player_complaints": {"value": "few"}},'
+        ' "operator": {"network": {"value": "GGNetwork"}}}'
+    )
+    assert {fact.path: fact.topic for fact in store.facts} == {
+        "banking.cashout_time": "banking",
+        "reputation.player_complaints": "reputation",
+        "operator.network": "reputation",
+    }
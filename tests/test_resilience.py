@@ -0,0 +1,44 @@
+import time
+
+import pytest
+import requests
+
+from tools.resilience import Guard, is_transient
+
+
+def test_local_timeouts_are_not_transient():
+    assert not is_transient(TimeoutError("batch deadline exceeded"))
+    assert is_transient(requests.Timeout("read timed out"))
+    assert is_transient(requests.ConnectionError("connection reset"))
+
+
+def test_local_timeouts_do_not_retry_or_open_the_breaker():
+    guard = Guard("host:example.com", rate=1000, burst=1000)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        raise TimeoutError("timed out waiting for a connection slot")
+
+    for _ in range(guard.breaker.threshold + 2):
+        with pytest.raises(TimeoutError):
+            guard.call(fetch)
+
+    assert len(calls) == guard.breaker.threshold + 2
+    assert guard.stats()["retries"] == 0
+    assert guard.breaker.allow()
+    assert guard.call(lambda: "ok") == "ok"
+
+
+def test_half_open_probe_that_times_out_on_the_rate_limit_frees_the_breaker():
+    guard = Guard("host:example.com", rate=0.5, burst=1)
+    guard.breaker.reset_seconds = 0
+    for _ in range(guard.breaker.threshold):
+        guard.breaker.failed()
+    guard.bucket.tokens = 0.0
+
+    with pytest.raises(TimeoutError):
+        guard.call(lambda: "ok", deadline=time.monotonic() + 0.01)
+
+    guard.bucket.tokens = 1.0
+    assert guard.call(lambda: "ok") == "ok"
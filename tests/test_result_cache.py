@@ -0,0 +1,38 @@
+import multiprocessing
+import time
+
+from tools.result_cache import ResultCache
+
+
+def _lookup(path, log):
+    def compute():
+        with open(log, "a") as f:
+            f.write("computed\n")
+        time.sleep(0.5)
+        return {"results": ["GGPoker review"]}
+
+    return ResultCache(path=path).get_or_compute("ggpoker review", compute)
+
+
+def test_processes_sharing_a_file_compute_a_key_once(tmp_path):
+    path, log = str(tmp_path / "search.sqlite3"), str(tmp_path / "computed.log")
+    with multiprocessing.get_context("spawn").Pool(3) as pool:
+        results = pool.starmap(_lookup, [(path, log)] * 3)
+
+    assert results == [{"results": ["GGPoker review"]}] * 3
+    with open(log) as f:
+        assert f.read().count("computed") == 1
+
+
+def test_a_failed_computation_frees_the_key(tmp_path):
+    cache = ResultCache(path=str(tmp_path / "search.sqlite3"))
+
+    def fail():
+        raise RuntimeError("backend down")
+
+    try:
+        cache.get_or_compute("key", fail)
+    except RuntimeError:
+        pass
+    assert cache.get_or_compute("key", lambda: "ok") == "ok"
+    assert cache.stats()["misses"] == 2
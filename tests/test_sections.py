@@ -0,0 +1,19 @@
+from sections import split_outline
+
+
+def test_h1_title_prefix_is_stripped_from_the_title():
+    title, sections = split_outline("# H1 Title: GGPoker Review 2026\n\n## Intro\n- a\n\n## Bonuses\n- b")
+    assert title == "GGPoker Review 2026"
+    assert [heading for heading, _ in sections] == ["Intro", "Bonuses"]
+
+
+def test_numbered_steps_stay_inside_their_bold_section():
+    outline = "**Intro**\n- a\n\n**How to sign up**\n1. Step one\n2. Step two\n\n**Verdict**\n- c"
+    _, sections = split_outline(outline)
+    assert [heading for heading, _ in sections] == ["Intro", "How to sign up", "Verdict"]
+    assert sections[1][1] == "1. Step one\n2. Step two"
+
+
+def test_numbered_outline_without_bold_headings_still_splits():
+    _, sections = split_outline("1. Intro\n- a\n2. Bonuses\n- b")
+    assert sections == [("Intro", "- a"), ("Bonuses", "- b")]
@@ -0,0 +1,134 @@
+import math
+import os
+import re
+from collections import Counter
+
+
+# Characters of page text returned per page (~4 characters per token)
+PAGE_BUDGET = int(os.environ.get("SCRAPE_PAGE_BUDGET", 8000))
+CHUNK_CHARS = 800
+
+# Field names the agents ask for -> terms that mark a chunk as covering them.
+# Terms match word prefixes, so "withdraw" also hits "withdrawals".
+FIELD_TERMS = {
+    "bonus": ["bonus", "welcome", "promotion", "promo", "freeroll", "match"],
+    "rakeback": ["rakeback", "rake", "cashback", "loyalty", "vip", "reward", "points"],
+    "games": ["game", "traffic", "stakes", "tournament", "mtt", "cash", "tables", "players"],
+    "software": ["software", "mobile", "app", "client", "download", "hud"],
+    "banking": ["deposit", "withdraw", "payment", "payout", "cashout", "fee", "processing"],
+    "withdrawals": ["withdraw", "payout", "cashout", "processing", "fee", "limit"],
+    "licensing": ["licen", "regulat", "jurisdiction", "commission", "authority", "restricted", "countr"],
+    "reputation": ["trust", "security", "complaint", "review", "rating", "owner", "network"],
+}
+DEFAULT_FIELDS = ["bonus", "rakeback", "licensing", "withdrawals", "games", "software"]
+
+K1 = 1.5
+B = 0.75
+
+
+def tokenize(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def query_terms(query=None, fields=None):
+    """Search terms for a free-text query and/or field names; the default fields when neither is given."""
+    terms = []
+    for field in (fields or ([] if query else DEFAULT_FIELDS)):
+        terms += FIELD_TERMS.get(field.lower().strip(), tokenize(field))
+    if query:
+        terms += [term for term in tokenize(query) if len(term) > 2]
+    return list(dict.fromkeys(terms))
+
+
+def split_chunks(text, size=CHUNK_CHARS):
+    """Sentence-aligned chunks of about `size` characters."""
+    sentences = re.split(r"(?<=[.!?])\s+", text)
+    chunks, current = [], ""
+    for sentence in sentences:
+        while len(sentence) > size:
+            # Run-on text with no sentence breaks (tables, lists) is cut at a space
+            cut = sentence.rfind(" ", 0, size)
+            cut = cut if cut > size // 2 else size
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + len(sentence) + 1 > size:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def bm25_scores(chunks, terms):
+    docs = [tokenize(chunk) for chunk in chunks]
+    avg_length = sum(len(doc) for doc in docs) / len(docs) if docs else 0
+
+    def count(doc_counts, term):
+        # Prefix match on longer terms catches plurals and inflections
+        if len(term) >= 4:
+            return sum(n for token, n in doc_counts.items() if token.startswith(term))
+        return doc_counts.get(term, 0)
+
+    doc_counts = [Counter(doc) for doc in docs]
+    scores = [0.0] * len(docs)
+    for term in terms:
+        frequencies = [count(counts, term) for counts in doc_counts]
+        containing = sum(1 for frequency in frequencies if frequency)
+        if not containing:
+            continue
+        idf = math.log(1 + (len(docs) - containing + 0.5) / (containing + 0.5))
+        for i, frequency in enumerate(frequencies):
+            if frequency:
+                norm = K1 * (1 - B + B * len(docs[i]) / (avg_length or 1))
+                scores[i] += idf * frequency * (K1 + 1) / (frequency + norm)
+    return scores
+
+
+def select_chunks(text, query=None, fields=None, budget=PAGE_BUDGET):
+    """
+    The parts of `text` most relevant to `query`/`fields`, within `budget`
+    characters and in page order. The opening chunk is always kept for
+    context. Text that already fits is returned untouched.
+    """
+    if len(text) <= budget:
+        return text
+
+    chunks = split_chunks(text)
+    scores = bm25_scores(chunks, query_terms(query, fields))
+    ranked = sorted(range(1, len(chunks)), key=lambda i: (-scores[i], i))
+
+    chosen = {0}
+    used = len(chunks[0])
+    for i in ranked:
+        if scores[i] <= 0:
+            break
+        if used + len(chunks[i]) > budget:
+            continue
+        chosen.add(i)
+        used += len(chunks[i])
+
+    if len(chosen) == 1:
+        # Nothing matched: fall back to the start of the page, as before
+        for i in range(1, len(chunks)):
+            if used + len(chunks[i]) > budget:
+                break
+            chosen.add(i)
+            used += len(chunks[i])
+
+    about = query or ", ".join(fields or DEFAULT_FIELDS)
+    parts = []
+    previous = -1
+    for i in sorted(chosen):
+        if i != previous + 1:
+            parts.append("[…]")
+        parts.append(chunks[i])
+        previous = i
+    if previous != len(chunks) - 1:
+        parts.append("[…]")
+    header = f"[{len(chosen)} of {len(chunks)} page sections, picked for: {about}]"
+    return header + "\n" + "\n".join(parts)
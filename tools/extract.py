@@ -0,0 +1,109 @@
+import os
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+
+# Hard ceiling on bytes downloaded per page; the rest of a heavy landing page
+# is almost always scripts, footers and repeated promo blocks
+MAX_BYTES = int(os.environ.get("SCRAPE_MAX_BYTES", 1_500_000))
+
+# Never <form>: ASP.NET and similar sites wrap the whole page in one
+NOISE_TAGS = ["script", "style", "noscript", "iframe", "svg", "template"]
+BOILERPLATE_TAGS = ["nav", "header", "footer", "aside"]
+BOILERPLATE_ROLES = ["navigation", "banner", "contentinfo", "complementary", "dialog"]
+# Matched against whole class names and ids, so "has-sidebar" or "main-menu-offset" wrappers survive
+BOILERPLATE_HINTS = {
+    "cookie", "cookies", "cookie-banner", "cookie-consent", "consent", "newsletter",
+    "breadcrumb", "breadcrumbs", "menu", "main-menu", "site-menu", "navbar", "footer",
+    "site-footer", "sidebar",
+}
+MAIN_CONTENT = ["main", "article"]
+
+# A <main>/<article> with less text than this is probably a hero block, not the page
+MIN_MAIN_CHARS = 500
+
+
+def read_capped(response, limit=MAX_BYTES):
+    """Read a streamed response body, stopping once `limit` bytes have arrived."""
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= limit:
+            break
+    return b"".join(chunks)[:limit]
+
+
+def header_charset(content_type):
+    """Charset declared in a Content-Type header, or None to let the parser sniff it."""
+    for part in (content_type or "").split(";")[1:]:
+        name, _, value = part.strip().partition("=")
+        if name.lower() == "charset" and value:
+            return value.strip("\"' ")
+    return None
+
+
+def _is_boilerplate(tag):
+    if tag.name in ("html", "body", "main", "article"):
+        return False
+    if tag.name in BOILERPLATE_TAGS or tag.get("role") in BOILERPLATE_ROLES:
+        return True
+    names = {name.lower() for name in tag.get("class") or []}
+    names.add((tag.get("id") or "").lower())
+    return not BOILERPLATE_HINTS.isdisjoint(names)
+
+
+def _removable(tag):
+    # Checked only for matches: a "boilerplate" wrapper around the main content is a false positive
+    return _is_boilerplate(tag) and not (tag.find(MAIN_CONTENT) or tag.find(attrs={"role": "main"}))
+
+
+def parse(html, encoding=None):
+    try:
+        return BeautifulSoup(html, PARSER, from_encoding=encoding if isinstance(html, bytes) else None)
+    except Exception:
+        if PARSER == "html.parser":
+            raise
+        return BeautifulSoup(html, "html.parser", from_encoding=encoding if isinstance(html, bytes) else None)
+
+
+def extract_main_text(html, encoding=None):
+    """
+    Visible text of the page's main content: scripts and styles are removed,
+    nav/header/footer/cookie boilerplate is skipped, and <main>/<article> is
+    preferred when it holds a real amount of text.
+    """
+    soup = parse(html, encoding)
+
+    for tag in soup(NOISE_TAGS):
+        tag.decompose()
+    for tag in soup.find_all(_removable):
+        # Nested matches are already gone with their parent
+        if not getattr(tag, "decomposed", False):
+            tag.decompose()
+
+    root = soup.body or soup
+    for candidate in soup.find_all(MAIN_CONTENT) + soup.find_all(attrs={"role": "main"}):
+        text = candidate.get_text(separator=" ", strip=True)
+        if len(text) >= MIN_MAIN_CHARS:
+            return text
+
+    text = root.get_text(separator=" ", strip=True)
+    # Boilerplate rules that ate the whole page must not cost us the page
+    return text or full_text(html, encoding)
+
+
+def full_text(html, encoding=None):
+    """All visible text, with only scripts and styles removed."""
+    soup = parse(html, encoding)
+    for tag in soup(["script", "style", "noscript", "iframe", "svg"]):
+        tag.decompose()
+    return soup.get_text(separator=" ", strip=True)
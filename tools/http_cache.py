@@ -0,0 +1,194 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import storage
+
+
+DEFAULT_TTL = int(os.environ.get("SCRAPE_CACHE_TTL", 6 * 60 * 60))
+DEFAULT_MAX_BYTES = int(os.environ.get("SCRAPE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    text TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: bytes
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    expires_at: float
+
+    def is_fresh(self, now=None):
+        return (now or time.time()) < self.expires_at
+
+    def validators(self):
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    Disk-backed page cache keyed by URL.
+
+    Stores the raw response bytes next to the extracted text so a fresh hit
+    skips both the network and the HTML parse. Stale entries keep their
+    ETag / Last-Modified validators so a refetch can be answered with a 304.
+    Total body size is capped; least recently used pages are evicted first.
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or storage.data_path("scrape.sqlite3")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        with storage.open_db(self.path) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return storage.connect(self.path)
+
+    def get(self, url):
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT url, body, text, etag, last_modified, fetched_at, expires_at "
+                "FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE pages SET last_access = ? WHERE url = ?",
+                (time.time(), url)
+            )
+        return CacheEntry(*row)
+
+    def put(self, url, body, text, etag=None, last_modified=None, ttl=None):
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, body, text, etag, last_modified, fetched_at, expires_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, body, text, etag, last_modified, now, expires_at, now, len(body))
+            )
+            self._evict(conn)
+
+    def refresh(self, url, ttl=None):
+        """Mark an entry fresh again after a 304 Not Modified."""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE pages SET fetched_at = ?, expires_at = ?, last_access = ? WHERE url = ?",
+                (now, expires_at, now, url)
+            )
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for url, size in conn.execute(
+            "SELECT url, size FROM pages ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            total -= size
+            evicted += 1
+        self._incr(conn, "evictions", evicted)
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM pages")
+            conn.execute("DELETE FROM stats")
+
+    # ---------------- STATS ----------------
+
+    def _incr(self, conn, name, amount=1):
+        conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    def record(self, name, amount=1):
+        with self._lock, self._connect() as conn:
+            self._incr(conn, name, amount)
+
+    def stats(self):
+        """
+        Counters persisted across processes: hits, revalidated (304s), misses,
+        evictions and the fetch/parse seconds spent on misses, plus an estimate
+        of the seconds saved by hits and revalidations.
+        """
+        with self._lock, self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()
+
+        hits = int(counters.get("hits", 0))
+        revalidated = int(counters.get("revalidated", 0))
+        misses = int(counters.get("misses", 0))
+        fetch_seconds = counters.get("fetch_seconds", 0.0)
+        parse_seconds = counters.get("parse_seconds", 0.0)
+        avg_fetch = fetch_seconds / misses if misses else 0.0
+        avg_parse = parse_seconds / misses if misses else 0.0
+        lookups = hits + revalidated + misses
+
+        return {
+            "hits": hits,
+            "revalidated": revalidated,
+            "misses": misses,
+            "evictions": int(counters.get("evictions", 0)),
+            "hit_rate": (hits + revalidated) / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "fetch_seconds": fetch_seconds,
+            "parse_seconds": parse_seconds,
+            "saved_seconds": hits * (avg_fetch + avg_parse) + revalidated * avg_parse,
+        }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Process-wide cache, disabled with SCRAPE_CACHE=0."""
+    global _default_cache
+    if os.environ.get("SCRAPE_CACHE", "1") == "0":
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = HttpCache()
+        return _default_cache
@@ -0,0 +1,44 @@
+import os
+import threading
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", 32))
+PER_HOST_LIMIT = int(os.environ.get("HTTP_PER_HOST_LIMIT", 4))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Process-wide keep-alive session shared by every scrape."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+class HostLimiter:
+    """Caps the number of in-flight requests per host."""
+
+    def __init__(self, limit=PER_HOST_LIMIT):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._slots = defaultdict(lambda: threading.BoundedSemaphore(self.limit))
+
+    def slot(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            return self._slots[host]
+
+
+host_limiter = HostLimiter()
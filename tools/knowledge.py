@@ -0,0 +1,294 @@
+import contextvars
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+import cassette
+import storage
+import tracing
+
+
+DEFAULT_PATH = storage.data_path("knowledge.sqlite3")
+# Older entries are left out of search results
+MAX_AGE_DAYS = float(os.environ.get("KNOWLEDGE_MAX_AGE_DAYS", 90))
+SNIPPET_TOKENS = 48
+
+_operator = contextvars.ContextVar("operator", default=None)
+
+
+def operator_key(operator_input):
+    """'https://www.GGPoker.com/' and 'GGPoker' both become 'ggpoker'."""
+    text = operator_input.strip().lower()
+    if re.match(r"^https?://", text) or re.match(r"^[\w-]+(\.[\w-]+)+(/|$)", text):
+        host = re.sub(r"^https?://", "", text).split("/")[0]
+        host = re.sub(r"^www\.", "", host)
+        text = host.split(".")[0]
+    return re.sub(r"[^a-z0-9]+", "", text) or text
+
+
+@contextmanager
+def operator_scope(operator_input):
+    """Tag everything indexed in this context (and threads copied from it) with the operator."""
+    token = _operator.set(operator_key(operator_input))
+    try:
+        yield
+    finally:
+        _operator.reset(token)
+
+
+def current_operator():
+    return _operator.get()
+
+
+def match_query(text):
+    """Free text as an FTS5 OR-query of quoted terms, so punctuation can't break the syntax."""
+    terms = dict.fromkeys(term.lower() for term in re.findall(r"\w+", text) if len(term) > 1)
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+class KnowledgeIndex:
+    """
+    Full-text index of what earlier reviews collected: scraped pages, search
+    results and parsed research facts, tagged with operator, network, URL and
+    time. Re-indexing the same page, query or fact replaces the old entry.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        with storage.open_db(path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "id INTEGER PRIMARY KEY, kind TEXT NOT NULL, operator TEXT NOT NULL, network TEXT, "
+                "key TEXT NOT NULL, url TEXT, content TEXT NOT NULL, created_at REAL NOT NULL, "
+                "UNIQUE (kind, operator, key))"
+            )
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5("
+                "key, content, content='documents', content_rowid='id', tokenize='porter unicode61')"
+            )
+            # Keep the FTS table in step with documents
+            conn.executescript(
+                "CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN "
+                "INSERT INTO documents_fts (rowid, key, content) VALUES (new.id, new.key, new.content); END;"
+                "CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN "
+                "INSERT INTO documents_fts (documents_fts, rowid, key, content) "
+                "VALUES ('delete', old.id, old.key, old.content); END;"
+                "CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE OF key, content ON documents BEGIN "
+                "INSERT INTO documents_fts (documents_fts, rowid, key, content) "
+                "VALUES ('delete', old.id, old.key, old.content); "
+                "INSERT INTO documents_fts (rowid, key, content) VALUES (new.id, new.key, new.content); END;"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS operators ("
+                "operator TEXT PRIMARY KEY, network TEXT, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return storage.connect(self.path)
+
+    def add(self, kind, key, content, url=None, operator=None):
+        if cassette.replaying():
+            # Replayed lookups come from the recording; a replay must not grow the real index
+            return
+        operator = operator or current_operator() or ""
+        if isinstance(url, (list, tuple)):
+            # Facts may cite several pages; the first one stands for them
+            url = next((item for item in url if isinstance(item, str)), None)
+        elif not isinstance(url, str):
+            url = None
+        if not content or not content.strip():
+            return
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT network FROM operators WHERE operator = ?", (operator,)).fetchone()
+            conn.execute(
+                "INSERT INTO documents (kind, operator, network, key, url, content, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, operator, key) DO UPDATE SET "
+                "network = excluded.network, url = excluded.url, created_at = excluded.created_at, "
+                "content = excluded.content",
+                (kind, operator, row[0] if row else None, key, url, content, time.time())
+            )
+
+    def add_page(self, url, text, operator=None):
+        self.add("page", url, text, url=url, operator=operator)
+
+    def drop_facts(self, urls, operator=None):
+        """Forget facts taken from these pages, e.g. once a refresh finds they changed."""
+        operator = operator or current_operator() or ""
+        urls = list(urls)
+        if not urls or cassette.replaying():
+            return
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"DELETE FROM documents WHERE kind = 'fact' AND operator = ? AND url IN ({', '.join('?' for _ in urls)})",
+                [operator] + urls
+            )
+
+    def add_search(self, query, result, operator=None):
+        self.add("search", query, result, operator=operator)
+
+    def add_facts(self, facts, operator=None):
+        """Parsed research facts (see facts.FactStore); also records the operator's network."""
+        operator = operator or current_operator() or ""
+        for fact in facts:
+            if fact.path.lower().split(".")[-1] == "network" and isinstance(fact.value, str):
+                self.set_network(operator, fact.value)
+                break
+        for fact in facts:
+            self.add("fact", fact.path, fact.render(), url=fact.source_url, operator=operator)
+
+    def set_network(self, operator, network):
+        network = network.strip().lower()
+        if not network or len(network) > 60 or cassette.replaying():
+            return
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO operators (operator, network, updated_at) VALUES (?, ?, ?)",
+                (operator, network, time.time())
+            )
+            conn.execute("UPDATE documents SET network = ? WHERE operator = ?", (network, operator))
+
+    def network_of(self, operator):
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT network FROM operators WHERE operator = ?", (operator,)).fetchone()
+        return row[0] if row else None
+
+    def search(self, query, operator=None, network=None, kinds=None, limit=5, max_age_days=MAX_AGE_DAYS):
+        """
+        Best BM25 matches for `query`, optionally limited to an operator and/or
+        its network (either matches), kinds and age. Returns dicts with kind,
+        operator, network, key, url, age_days and a snippet.
+        """
+        expression = match_query(query)
+        if not expression:
+            return []
+
+        clauses = ["documents_fts MATCH ?"]
+        params = [expression]
+        scope = []
+        if operator:
+            scope.append("d.operator = ?")
+            params.append(operator_key(operator))
+        if network:
+            scope.append("d.network = ?")
+            params.append(network.strip().lower())
+        if scope:
+            clauses.append("(" + " OR ".join(scope) + ")")
+        if kinds:
+            clauses.append(f"d.kind IN ({', '.join('?' for _ in kinds)})")
+            params.extend(kinds)
+        if max_age_days:
+            clauses.append("d.created_at > ?")
+            params.append(time.time() - max_age_days * 86400)
+
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT d.kind, d.operator, d.network, d.key, d.url, d.created_at, "
+                f"snippet(documents_fts, 1, '', '', ' … ', {SNIPPET_TOKENS}) "
+                "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+                f"WHERE {' AND '.join(clauses)} ORDER BY bm25(documents_fts) LIMIT ?",
+                params + [limit]
+            ).fetchall()
+
+        now = time.time()
+        return [
+            {
+                "kind": kind,
+                "operator": operator,
+                "network": network,
+                "key": key,
+                "url": url,
+                "age_days": (now - created_at) / 86400,
+                "snippet": snippet,
+            }
+            for kind, operator, network, key, url, created_at, snippet in rows
+        ]
+
+    def stats(self):
+        with self._lock, self._connect() as conn:
+            counts = dict(conn.execute("SELECT kind, COUNT(*) FROM documents GROUP BY kind").fetchall())
+            operators = conn.execute("SELECT COUNT(DISTINCT operator) FROM documents").fetchone()[0]
+        return {"pages": counts.get("page", 0), "searches": counts.get("search", 0),
+                "facts": counts.get("fact", 0), "operators": operators}
+
+
+_default_index = None
+_default_lock = threading.Lock()
+
+
+def get_default_index():
+    """Process-wide index, disabled with KNOWLEDGE_INDEX=0."""
+    global _default_index
+    if os.environ.get("KNOWLEDGE_INDEX", "1") == "0":
+        return None
+    with _default_lock:
+        if _default_index is None:
+            _default_index = KnowledgeIndex()
+        return _default_index
+
+
+def format_results(results):
+    if not results:
+        return "No matches in earlier reviews; search the web."
+    blocks = []
+    for result in results:
+        tags = [result["kind"], result["operator"]]
+        if result["network"]:
+            tags.append(f"network: {result['network']}")
+        tags.append(f"{result['age_days']:.0f} days old")
+        header = f"[{' · '.join(tags)}] {result['key']}"
+        if result["url"] and result["url"] != result["key"]:
+            header += f" ({result['url']})"
+        blocks.append(f"{header}\n{result['snippet']}")
+    return "\n\n".join(blocks)
+
+
+class KnowledgeSearchInput(BaseModel):
+    query: str = Field(..., description="What to look up, e.g. 'rakeback structure' or 'withdrawal methods'")
+    operator: Optional[str] = Field(
+        None,
+        description="Limit to one operator (defaults to the operator under review and its network)"
+    )
+    network: Optional[str] = Field(None, description="Limit to a poker network, e.g. 'iPoker'")
+
+
+class KnowledgeSearchTool(BaseTool):
+    name: str = "knowledge_search"
+    description: str = (
+        "Search pages, search results and verified facts collected in earlier reviews of this operator, "
+        "its network and related rooms. Each match shows its source URL and age. Check here before "
+        "searching or scraping the web, and only go to the web for what is missing or stale."
+    )
+
+    args_schema: type[BaseModel] = KnowledgeSearchInput
+
+    def _run(self, query: str, operator: Optional[str] = None, network: Optional[str] = None) -> str:
+        with tracing.span(self.name, "tool", request_bytes=len(query)) as span:
+            index = get_default_index()
+            if index is None:
+                return "The knowledge index is disabled; search the web."
+
+            operator = operator or current_operator()
+
+            def lookup():
+                scope = network
+                if operator and not scope:
+                    scope = index.network_of(operator_key(operator))
+                results = index.search(query, operator=operator, network=scope)
+                if not results and (operator or scope):
+                    # Nothing on this room or its network yet; anything related is still useful
+                    results = index.search(query)
+                return format_results(results)
+
+            # The index grows with every run, so replays must see what the recorded run saw
+            result = cassette.through("knowledge", f"{operator}|{network}|{query}", lookup)
+            if span:
+                span.set(response_bytes=len(result))
+            return result
@@ -0,0 +1,128 @@
+import contextvars
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+
+
+PREFETCH_WORKERS = int(os.environ.get("PREFETCH_WORKERS", 6))
+QUERY_TEMPLATES = ["{op} review", "{op} poker review", "{op} rakeback", "{op} bonus", "{op} withdrawal"]
+
+_active = contextvars.ContextVar("prefetcher", default=None)
+
+
+def note_use(kind, key):
+    """Called by the tools on every search/page request, so prefetches can be scored."""
+    prefetcher = _active.get()
+    if prefetcher is not None:
+        prefetcher.used(kind, key)
+
+
+def operator_name(operator_input):
+    """The name agents will search for: the input itself, or the site name for a URL."""
+    text = operator_input.strip()
+    if re.match(r"^https?://", text, re.IGNORECASE):
+        host = re.sub(r"^https?://", "", text, flags=re.IGNORECASE).split("/")[0]
+        host = re.sub(r"^www\.", "", host, flags=re.IGNORECASE)
+        return host.split(".")[0]
+    return text
+
+
+def predicted_queries(operator_input):
+    name = operator_name(operator_input)
+    return [template.format(op=name) for template in QUERY_TEMPLATES]
+
+
+def predicted_urls(operator_input):
+    text = operator_input.strip()
+    return [text] if re.match(r"^https?://", text, re.IGNORECASE) else []
+
+
+class Prefetcher:
+    """
+    Fires the searches and page fetches a review is about to make, in the
+    background, so the tools find them in their caches. Tracks which
+    prefetched items the agents actually asked for.
+    """
+
+    def __init__(self, operator_input, scrape_tool=None, workers=PREFETCH_WORKERS):
+        from tools.http_cache import get_default_cache
+        from tools.search import normalize_query
+
+        self.queries = {normalize_query(query): query for query in predicted_queries(operator_input)}
+        # Pages only land somewhere the agents will look when the scrape cache is on
+        self.urls = predicted_urls(operator_input) if get_default_cache() is not None else []
+        self.scrape_tool = scrape_tool
+        self.workers = workers
+        self.hits = set()
+        self.failed = set()
+        self.started = None
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = 0
+        self._token = None
+
+    def start(self):
+        """Start prefetching and begin scoring tool requests made in this context."""
+        items = [("search", key) for key in self.queries] + [("page", url) for url in self.urls]
+        self._token = _active.set(self)
+        if not items:
+            return
+        self.started = time.perf_counter()
+        self._pending = len(items)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(items))))
+        for kind, key in items:
+            self._executor.submit(contextvars.copy_context().run, self._fetch, kind, key)
+
+    def stop(self):
+        """Stop scoring; fetches still in flight are abandoned."""
+        if self._token is not None:
+            _active.reset(self._token)
+            self._token = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch(self, kind, key):
+        from tools.search import cached_search
+        from tools.web_scraper import ScrapeWebsiteTool
+
+        with tracing.span(f"prefetch:{kind}", "tool", key=key):
+            try:
+                if kind == "search":
+                    cached_search(self.queries[key])
+                else:
+                    text = (self.scrape_tool or ScrapeWebsiteTool()).scrape(key)
+                    if text.startswith("Error scraping website"):
+                        raise RuntimeError(text)
+            except Exception:
+                with self._lock:
+                    self.failed.add((kind, key))
+            finally:
+                with self._lock:
+                    self._pending -= 1
+                    if not self._pending:
+                        self.seconds = time.perf_counter() - self.started
+
+    def used(self, kind, key):
+        if (kind == "search" and key in self.queries) or (kind == "page" and key in self.urls):
+            with self._lock:
+                self.hits.add((kind, key))
+
+    def stats(self):
+        with self._lock:
+            total = len(self.queries) + len(self.urls)
+            hits = len(self.hits)
+            return {
+                "searches": len(self.queries),
+                "pages": len(self.urls),
+                "hits": hits,
+                "wasted": total - hits,
+                "failed": len(self.failed),
+                "hit_rate": hits / total if total else 0.0,
+                "seconds": self.seconds,
+                "pending": self._pending,
+            }
@@ -0,0 +1,275 @@
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+
+
+SEARCH_RATE = float(os.environ.get("SEARCH_RATE", 1.0))
+SEARCH_BURST = int(os.environ.get("SEARCH_BURST", 3))
+HOST_RATE = float(os.environ.get("SCRAPE_HOST_RATE", 2.0))
+HOST_BURST = int(os.environ.get("SCRAPE_HOST_BURST", 4))
+RETRY_ATTEMPTS = int(os.environ.get("RETRY_ATTEMPTS", 3))
+RETRY_BASE_SECONDS = float(os.environ.get("RETRY_BASE_SECONDS", 0.5))
+RETRY_MAX_SECONDS = float(os.environ.get("RETRY_MAX_SECONDS", 8.0))
+BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", 5))
+BREAKER_RESET_SECONDS = float(os.environ.get("BREAKER_RESET_SECONDS", 30.0))
+
+TRANSIENT_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class TokenBucket:
+    """
+    Token bucket whose refill rate adapts to the backend: a throttling
+    response halves it, every success adds back a tenth of the configured
+    rate (AIMD).
+    """
+
+    def __init__(self, rate, burst):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Take a token, sleeping as needed. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1 and now >= self.blocked_until:
+                    self.tokens -= 1
+                    return waited
+                delay = max((1 - self.tokens) / self.rate, self.blocked_until - now)
+            if timeout is not None and waited + delay > timeout:
+                raise TimeoutError("rate limit wait exceeds the deadline")
+            time.sleep(delay)
+            waited += delay
+
+    def throttled(self, retry_after=None):
+        with self._lock:
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+            self.tokens = 0.0
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def succeeded(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive transient failures and fails fast for
+    `reset_seconds`; then lets a single probe through (half-open) and closes
+    again if it succeeds.
+    """
+
+    def __init__(self, failures=BREAKER_FAILURES, reset_seconds=BREAKER_RESET_SECONDS):
+        self.threshold = failures
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_seconds or self.probing:
+                return False
+            self.probing = True
+            return True
+
+    def succeeded(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def release(self):
+        """End a probe that never reached the backend."""
+        with self._lock:
+            self.probing = False
+
+    def failed(self):
+        """Record a failure; True when this one opened the circuit."""
+        with self._lock:
+            self.failures += 1
+            was_open = self.opened_at is not None
+            if self.probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+                self.probing = False
+                return not was_open
+            return False
+
+
+def is_transient(exc):
+    if isinstance(exc, requests.HTTPError):
+        return exc.response is not None and exc.response.status_code in TRANSIENT_STATUS
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout, ConnectionError)):
+        return True
+    # The builtin TimeoutError is only raised for our own deadlines, which say nothing about the host
+    if isinstance(exc, TimeoutError):
+        return False
+    # Search backends signal throttling with their own exception types
+    name = type(exc).__name__.lower()
+    return "ratelimit" in name or "timeout" in name
+
+
+def is_throttle(exc):
+    if isinstance(exc, requests.HTTPError):
+        return exc.response is not None and exc.response.status_code in (429, 503)
+    return "ratelimit" in type(exc).__name__.lower()
+
+
+def retry_after(exc):
+    response = getattr(exc, "response", None)
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return min(float(value), RETRY_MAX_SECONDS) if value else None
+    except ValueError:
+        return None
+
+
+class Guard:
+    """
+    Rate limit, retry and circuit breaking for one backend or host.
+
+    call(fn) waits for a token, runs fn, and retries transient failures with
+    full-jitter exponential backoff; an open circuit raises CircuitOpenError
+    without touching the network.
+    """
+
+    def __init__(self, name, rate, burst):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker()
+        self.calls = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self.retries = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.circuit_opens = 0
+        self._lock = threading.Lock()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def call(self, fn, deadline=None, span=None, attempts=RETRY_ATTEMPTS):
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                self._count("short_circuited")
+                raise CircuitOpenError(f"{self.name} is failing, skipped for {self.breaker.reset_seconds:.0f}s")
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            try:
+                waited = self.bucket.acquire(timeout=remaining)
+            except TimeoutError:
+                # A half-open probe that never got a token must not hold the circuit shut
+                self.breaker.release()
+                raise
+            self._count("calls")
+            if waited:
+                self._count("throttled")
+                self._count("wait_seconds", waited)
+                if span:
+                    span.incr("throttle_wait_s", round(waited, 3))
+
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_transient(e):
+                    if isinstance(e, TimeoutError):
+                        self.breaker.release()
+                    else:
+                        # The backend answered; a 404 says nothing about its health
+                        self.breaker.succeeded()
+                    raise
+                self._count("failures")
+                if is_throttle(e):
+                    self.bucket.throttled(retry_after(e))
+                if self.breaker.failed():
+                    self._count("circuit_opens")
+                if attempt == attempts - 1:
+                    raise
+
+                backoff = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+                backoff = max(backoff, retry_after(e) or 0)
+                if deadline is not None and time.monotonic() + backoff >= deadline:
+                    raise
+                self._count("retries")
+                if span:
+                    span.incr("retries")
+                time.sleep(backoff)
+                continue
+
+            self.breaker.succeeded()
+            self.bucket.succeeded()
+            return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "wait_seconds": round(self.wait_seconds, 2),
+                "retries": self.retries,
+                "failures": self.failures,
+                "circuit_opens": self.circuit_opens,
+                "short_circuited": self.short_circuited,
+                "rate": round(self.bucket.rate, 2),
+            }
+
+
+class Guards:
+    """Process-wide guards: one per search backend and one per scraped host."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._guards = {}
+
+    def get(self, name, rate, burst):
+        with self._lock:
+            if name not in self._guards:
+                self._guards[name] = Guard(name, rate, burst)
+            return self._guards[name]
+
+    def search(self, backend="duckduckgo"):
+        return self.get(f"search:{backend}", SEARCH_RATE, SEARCH_BURST)
+
+    def host(self, url):
+        return self.get(f"host:{urlsplit(url).netloc.lower()}", HOST_RATE, HOST_BURST)
+
+    def stats(self):
+        with self._lock:
+            guards = list(self._guards.values())
+        return {guard.name: guard.stats() for guard in guards}
+
+    def totals(self, prefix):
+        """Counters summed over every guard whose name starts with `prefix`."""
+        totals = defaultdict(float)
+        for name, stats in self.stats().items():
+            if name.startswith(prefix):
+                for key, value in stats.items():
+                    if key != "rate":
+                        totals[key] += value
+        return dict(totals)
+
+
+guards = Guards()
@@ -0,0 +1,186 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import storage
+
+
+INFLIGHT_POLL_SECONDS = 0.1
+
+
+class ResultCache:
+    """
+    Two-level cache for tool results: an in-memory LRU with TTL, optionally
+    backed by a SQLite file so results survive across runs and processes.
+
+    `get_or_compute` coalesces concurrent callers for the same key, so only
+    one upstream request is made while the others wait for its result. Within
+    a process callers share a future; with a SQLite file, batch and job-worker
+    processes also see each other's in-flight keys and wait up to
+    `inflight_seconds` for the result instead of repeating the request.
+    """
+
+    def __init__(self, maxsize=512, ttl=24 * 60 * 60, path=None, inflight_seconds=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self.inflight_seconds = inflight_seconds
+        self._items = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._schema_ready = False
+
+    def _connect(self):
+        # The persistent layer is created lazily so importing a tool never touches disk
+        if not self._schema_ready:
+            with storage.open_db(self.path) as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS results "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE TABLE IF NOT EXISTS inflight (key TEXT PRIMARY KEY, started_at REAL NOT NULL)")
+            self._schema_ready = True
+        return storage.connect(self.path)
+
+    # ---------------- LOOKUP ----------------
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                value, expires_at = item
+                if now < expires_at:
+                    self._items.move_to_end(key)
+                    return value
+                del self._items[key]
+
+        if not self.path:
+            return None
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or now >= row[1]:
+            return None
+
+        value = json.loads(row[0])
+        self._remember(key, value, row[1])
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._remember(key, value, expires_at)
+        if self.path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at)
+                )
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._items[key] = (value, expires_at)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        claimed = False
+        try:
+            value, claimed = self._await_other_process(key) if self.path else (None, False)
+            with self._lock:
+                if value is None:
+                    self.misses += 1
+                else:
+                    self.coalesced += 1
+            if value is None:
+                value = compute()
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            if claimed:
+                self._release(key)
+
+    # ---------------- CROSS-PROCESS IN-FLIGHT ----------------
+
+    def _claim(self, key):
+        """Mark `key` as computed by this process; False while another process holds a live claim."""
+        now = time.time()
+        with self._connect() as conn:
+            # A claim older than inflight_seconds belongs to a process that died or hung
+            conn.execute("DELETE FROM inflight WHERE key = ? AND started_at < ?", (key, now - self.inflight_seconds))
+            return conn.execute(
+                "INSERT OR IGNORE INTO inflight (key, started_at) VALUES (?, ?)", (key, now)
+            ).rowcount == 1
+
+    def _release(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM inflight WHERE key = ?", (key,))
+
+    def _await_other_process(self, key):
+        """
+        (value, False) when another process stored the result while we waited,
+        else (None, True) with the key claimed for this process to compute.
+        """
+        while not self._claim(key):
+            time.sleep(INFLIGHT_POLL_SECONDS)
+            value = self.get(key)
+            if value is not None:
+                return value, False
+        # The other process may have finished between our miss and the claim
+        value = self.get(key)
+        if value is not None:
+            self._release(key)
+            return value, False
+        return None, True
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = self.coalesced = 0
+        if self.path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM results")
+                conn.execute("DELETE FROM inflight")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "entries": len(self._items),
+            }
@@ -1,6 +1,82 @@
+import os
+import re
+import threading
+
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
+import cassette
+import storage
+import tracing
+from tools.knowledge import get_default_index
+from tools.prefetch import note_use
+from tools.resilience import guards
+from tools.result_cache import ResultCache
+
+
+SEARCH_CACHE_TTL = int(os.environ.get("SEARCH_CACHE_TTL", 24 * 60 * 60))
+SEARCH_CACHE_PATH = os.environ.get(
+    "SEARCH_CACHE_PATH",
+    storage.data_path("search.sqlite3")
+)
+
+search_cache = ResultCache(
+    ttl=SEARCH_CACHE_TTL,
+    path=SEARCH_CACHE_PATH if os.environ.get("SEARCH_CACHE_PERSIST", "1") != "0" else None
+)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_search_client():
+    """Build the DuckDuckGo client once per process."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from langchain_community.tools import DuckDuckGoSearchRun
+
+            _client = DuckDuckGoSearchRun()
+        return _client
+
+
+def set_search_client(client):
+    """Swap the search backend (anything with a `run(query)` method)."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def normalize_query(query):
+    query = query.casefold().strip().strip("\"'")
+    return re.sub(r"\s+", " ", query)
+
+
+def cached_search(query, span=None):
+    """
+    Search through the shared result cache (throttled, retried and
+    circuit-broken on a miss) and record the result in the knowledge index.
+    """
+    key = normalize_query(query)
+    computed = []
+
+    def compute():
+        computed.append(True)
+        return cassette.through(
+            "search",
+            key,
+            lambda: guards.search().call(lambda: get_search_client().run(query), span=span)
+        )
+
+    # Replays bypass the cache so they exercise the recording, and leave the cache as it was
+    result = compute() if cassette.replaying() else search_cache.get_or_compute(key, compute)
+    if not computed:
+        cassette.seen("search", key, result)
+    index = get_default_index()
+    if index is not None:
+        index.add_search(key, result)
+    return result
+
 
 class DuckDuckGoSearchInput(BaseModel):
     query: str = Field(..., description="Search query")
@@ -14,7 +90,9 @@ class DuckDuckGoSearchTool(BaseTool):
     args_schema: type[BaseModel] = DuckDuckGoSearchInput
 
     def _run(self, query: str) -> str:
-        from langchain_community.tools import DuckDuckGoSearchRun
-
-        search = DuckDuckGoSearchRun()
-        return search.run(query)
+        with tracing.span(self.name, "tool", request_bytes=len(query), retries=0) as span:
+            note_use("search", normalize_query(query))
+            result = cached_search(query, span)
+            if span:
+                span.set(response_bytes=len(result))
+            return result
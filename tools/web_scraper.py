@@ -1,43 +1,221 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, List, Optional
+
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
-import requests
-from bs4 import BeautifulSoup
+
+import cassette
+import limits
+import tracing
+from tools.chunks import select_chunks
+from tools.extract import MAX_BYTES, extract_main_text, header_charset, read_capped
+from tools.http_cache import get_default_cache
+from tools.http_pool import get_session, host_limiter
+from tools.knowledge import get_default_index
+from tools.prefetch import note_use
+from tools.resilience import CircuitOpenError, guards
+
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0 Safari/537.36"
+    )
+}
+
+
+def extract_text(html, encoding=None):
+    # Kept whole for the cache and the knowledge index; each call trims it to what was asked for
+    return extract_main_text(html, encoding)
+
+
+def page_record(status, body, content_type=None, etag=None, last_modified=None):
+    """A fetched page as plain JSON data, so cassettes can store it."""
+    return {
+        "status": status,
+        "body": body.decode("latin-1"),
+        "content_type": content_type,
+        "etag": etag,
+        "last_modified": last_modified,
+    }
 
 
 class ScrapeWebsiteInput(BaseModel):
-    url: str = Field(..., description="Full website URL to scrape")
+    url: Optional[str] = Field(None, description="Full website URL to scrape")
+    urls: Optional[List[str]] = Field(
+        None,
+        description="Several full website URLs to scrape concurrently in one call"
+    )
+    query: Optional[str] = Field(
+        None,
+        description="What you are looking for on the page(s), e.g. 'rakeback percentage and VIP levels'"
+    )
+    fields: Optional[List[str]] = Field(
+        None,
+        description="Facts to look for, e.g. ['bonus', 'rakeback', 'licensing', 'withdrawals']"
+    )
 
 
 class ScrapeWebsiteTool(BaseTool):
     name: str = "scrape_website"
     description: str = (
         "Scrape and extract the main visible text content from a website URL "
-        "for SEO analysis."
+        "for SEO analysis. Pass `urls` instead of `url` to fetch several pages "
+        "at once. Long pages are cut down to their most relevant sections: pass "
+        "`query` or `fields` to say what you need from them."
     )
 
     # 🔴 REQUIRED annotation
     args_schema: type[BaseModel] = ScrapeWebsiteInput
 
-    def _run(self, url: str) -> str:
-        try:
-            headers = {
-                "User-Agent": (
-                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/120.0 Safari/537.36"
+    # HttpCache instance; falls back to the process-wide cache when unset
+    cache: Any = None
+
+    # Batch mode: worker threads and overall deadline (seconds) per call
+    max_workers: int = 8
+    batch_deadline: float = 45.0
+
+    def _get_cache(self):
+        return self.cache if self.cache is not None else get_default_cache()
+
+    def _run(
+        self,
+        url: Optional[str] = None,
+        urls: Optional[List[str]] = None,
+        query: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> str:
+        with tracing.span(self.name, "tool", pages=len(urls or []) or 1, retries=0) as span:
+            if urls:
+                urls = ([url] if url else []) + list(urls)
+                pages = list(zip(urls, self.scrape_many(urls, span)))
+                result = "\n\n".join(
+                    f"### {page_url}\n{select_chunks(text, query, fields)}" for page_url, text in pages
                 )
-            }
+            elif url:
+                pages = [(url, self.scrape(url, span=span))]
+                result = select_chunks(pages[0][1], query, fields)
+            else:
+                pages = []
+                result = "Error scraping website: no url given"
+
+            for page_url, _ in pages:
+                note_use("page", page_url)
+
+            index = get_default_index()
+            if index is not None:
+                for page_url, text in pages:
+                    if not text.startswith("Error scraping website"):
+                        index.add_page(page_url, text)
+
+            if span:
+                span.set(response_bytes=len(result))
+            return result
+
+    def scrape_many(self, urls, span=None, revalidate=False):
+        """
+        Scrape several URLs concurrently over the shared session and return
+        their texts in input order. Each host gets at most
+        `HTTP_PER_HOST_LIMIT` requests in flight; anything unfinished when
+        `batch_deadline` expires comes back as an error string.
+        """
+        deadline = time.monotonic() + self.batch_deadline
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(urls))))
+        futures = [
+            executor.submit(contextvars.copy_context().run, self.scrape, url, deadline, span, revalidate)
+            for url in urls
+        ]
+        wait(futures, timeout=self.batch_deadline)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        results = []
+        for url, future in zip(urls, futures):
+            if future.done() and not future.cancelled():
+                results.append(future.result())
+            else:
+                results.append(f"Error scraping website {url}: batch deadline exceeded")
+        return results
+
+    def scrape(self, url, deadline=None, span=None, revalidate=False):
+        """
+        Main text of `url`. revalidate: check a fresh cached copy with the
+        origin anyway (a conditional GET, so usually a bodiless 304).
+        """
+        try:
+            # Replays read pages from the recording only (304s were recorded with their body)
+            cache = None if cassette.replaying() else self._get_cache()
+            entry = cache.get(url) if cache else None
+
+            if entry and entry.is_fresh() and not revalidate:
+                cache.record("hits")
+                cassette.seen("page", url, lambda: page_record(200, entry.body, etag=entry.etag,
+                                                                last_modified=entry.last_modified))
+                return entry.text
+
+            headers = dict(HEADERS)
+            if entry:
+                headers.update(entry.validators())
+
+            def fetch():
+                timeout = 15
+                if deadline is not None:
+                    timeout = min(timeout, deadline - time.monotonic())
+                    if timeout <= 0:
+                        raise TimeoutError("batch deadline exceeded")
+
+                slot = host_limiter.slot(url)
+                if not slot.acquire(timeout=timeout):
+                    raise TimeoutError("timed out waiting for a connection slot")
+                try:
+                    with limits.scrape_slot():
+                        response = get_session().get(url, headers=headers, timeout=timeout, stream=True)
+                        try:
+                            if entry is not None and response.status_code == 304:
+                                # Recorded with the cached body so a replay with a cold cache still has it
+                                return page_record(304, entry.body, etag=entry.etag,
+                                                   last_modified=entry.last_modified)
+                            response.raise_for_status()
+                            # Stop downloading past the byte ceiling instead of buffering the whole page
+                            return page_record(
+                                response.status_code,
+                                read_capped(response, MAX_BYTES),
+                                content_type=response.headers.get("Content-Type"),
+                                etag=response.headers.get("ETag"),
+                                last_modified=response.headers.get("Last-Modified")
+                            )
+                        finally:
+                            response.close()
+                finally:
+                    slot.release()
+
+            started = time.perf_counter()
+            # Per-host token bucket, retries on 429/5xx/connection errors, circuit breaker
+            page = cassette.through(
+                "page", url, lambda: guards.host(url).call(fetch, deadline=deadline, span=span)
+            )
+
+            if page["status"] == 304 and entry is not None:
+                cache.refresh(url)
+                cache.record("revalidated")
+                return entry.text
 
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
+            fetched = time.perf_counter()
 
-            soup = BeautifulSoup(response.text, "html.parser")
+            body = page["body"].encode("latin-1")
+            text = extract_text(body, header_charset(page["content_type"]))
 
-            for tag in soup(["script", "style", "noscript", "iframe", "svg"]):
-                tag.decompose()
+            if cache:
+                cache.put(url, body, text, etag=page["etag"], last_modified=page["last_modified"])
+                cache.record("misses")
+                cache.record("fetch_seconds", fetched - started)
+                cache.record("parse_seconds", time.perf_counter() - fetched)
 
-            text = soup.get_text(separator=" ", strip=True)
-            return text[:8000]
+            return text
 
+        except CircuitOpenError as e:
+            return f"Error scraping website {url}: {str(e)}. Don't retry it; use another source."
         except Exception as e:
             return f"Error scraping website {url}: {str(e)}"
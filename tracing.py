@@ -0,0 +1,181 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# USD per 1M tokens (input, output); unknown models are costed as the flagship
+PRICES = {
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+_tracer = contextvars.ContextVar("tracer", default=None)
+_stage = contextvars.ContextVar("stage", default=None)
+
+
+def current_stage():
+    """Name of the task span the caller is running under, if any."""
+    return _stage.get()
+
+
+def estimate_tokens(payload):
+    """Rough token count (~4 characters per token) for strings or message lists."""
+    if payload is None:
+        return 0
+    if not isinstance(payload, str):
+        payload = json.dumps(payload, default=str)
+    return max(1, len(payload) // 4) if payload else 0
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    name = (model or "").split("/")[-1]
+    input_price, output_price = PRICES.get(name, PRICES["gpt-4.1"])
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+class Span:
+    def __init__(self, name, kind, stage, attrs):
+        self.name = name
+        self.kind = kind
+        self.stage = stage
+        self.attrs = dict(attrs)
+        self.thread = threading.get_ident()
+        self.start = time.time()
+        self.seconds = 0.0
+        self.error = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def incr(self, name, amount=1):
+        self.attrs[name] = self.attrs.get(name, 0) + amount
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "stage": self.stage,
+            "start": self.start,
+            "seconds": self.seconds,
+            "error": self.error,
+            **self.attrs,
+        }
+
+
+class Tracer:
+    """
+    Collects spans for one crew run: one per stage ("task"), per chat
+    completion ("llm") and per tool call ("tool"). LLM and tool spans are
+    attributed to the stage running on the same thread.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def activate(self):
+        return _tracer.set(self)
+
+    def deactivate(self, token):
+        _tracer.reset(token)
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    # ---------------- EXPORT ----------------
+
+    def export_jsonl(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for span in self.spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+    def export_chrome(self, path):
+        """Chrome trace format, viewable in chrome://tracing or Perfetto."""
+        events = [
+            {
+                "name": span.name,
+                "cat": span.kind,
+                "ph": "X",
+                "ts": span.start * 1_000_000,
+                "dur": span.seconds * 1_000_000,
+                "pid": os.getpid(),
+                "tid": span.thread,
+                "args": {"stage": span.stage, "error": span.error, **span.attrs},
+            }
+            for span in self.spans
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+
+    def export(self, directory, prefix):
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, prefix)
+        self.export_jsonl(f"{base}.spans.jsonl")
+        self.export_chrome(f"{base}.trace.json")
+        return base
+
+    # ---------------- SUMMARY ----------------
+
+    def summary(self):
+        """One row per stage, in the order stages started."""
+        rows = {}
+        for span in sorted(self.spans, key=lambda s: s.start):
+            if span.kind == "task":
+                rows[span.name] = {
+                    "stage": span.name,
+                    "seconds": round(span.seconds, 2),
+                    "llm_calls": 0,
+                    "tool_calls": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "cost_usd": 0.0,
+                    "models": "",
+                }
+        for span in self.spans:
+            row = rows.get(span.stage)
+            if row is None or span.kind == "task":
+                continue
+            if span.kind == "llm":
+                row["llm_calls"] += 1
+                row["prompt_tokens"] += span.attrs.get("prompt_tokens", 0)
+                row["completion_tokens"] += span.attrs.get("completion_tokens", 0)
+                row["cost_usd"] = round(row["cost_usd"] + span.attrs.get("cost_usd", 0.0), 4)
+                model = span.attrs.get("model")
+                if model and model not in row["models"].split(", "):
+                    row["models"] = ", ".join(filter(None, [row["models"], model]))
+            elif span.kind == "tool":
+                row["tool_calls"] += 1
+        return list(rows.values())
+
+
+@contextmanager
+def span(name, kind, **attrs):
+    """
+    Record a span on the active tracer. Yields the Span (or None when no
+    tracer is active) so callers can attach sizes, tokens and retries.
+    """
+    tracer = _tracer.get()
+    if tracer is None:
+        yield None
+        return
+
+    current = Span(name, kind, name if kind == "task" else _stage.get(), attrs)
+    stage_token = _stage.set(name) if kind == "task" else None
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.seconds = time.perf_counter() - started
+        if stage_token is not None:
+            _stage.reset(stage_token)
+        tracer.add(current)